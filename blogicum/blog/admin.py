@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Location, Comment, Post
+from .models import Category, Location, Comment, Follow, Post
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -21,6 +21,8 @@ class PostAdmin(admin.ModelAdmin):
         'title',
         'is_published',
         'category',
+        'comment_count',
+        'updated_at',
     )
     list_editable = (
         'is_published',
@@ -35,3 +37,4 @@ admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location)
 admin.site.register(Comment)
+admin.site.register(Follow)
@@ -0,0 +1,28 @@
+from django.urls import path
+
+from . import async_views
+
+app_name = 'blog_async'
+
+urlpatterns = [
+    path(
+        "",
+        async_views.index,
+        name="index"
+    ),
+    path(
+        "posts/<int:pk>/",
+        async_views.post_detail,
+        name="post_detail"
+    ),
+    path(
+        "category/<slug:category_slug>/",
+        async_views.category_posts,
+        name="category_posts",
+    ),
+    path(
+        "profile/<str:username>/",
+        async_views.profile,
+        name="profile",
+    ),
+]
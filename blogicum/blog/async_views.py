@@ -0,0 +1,235 @@
+"""Async counterparts of the read-only blog views.
+
+Under ASGI a sync view holds a thread for the whole request. These views
+leave the event loop only for blocking work (queries, cache access and
+template rendering) and run the independent queries of a page at the
+same time. They render the same templates as blog.views and are served
+under /async/.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+
+from config import COMMENTS_PER_PAGE, PAGE_CACHE_TIMEOUT
+
+from .cache import (
+    FEED_TAG,
+    cached_response,
+    get_cached_page,
+    page_cache_key,
+    post_tags,
+    set_cached_page,
+)
+from .concurrency import run_concurrently
+from .forms import CreateCommentForm
+from .lookups import published_category_by_slug
+from .mixins import (
+    PostDetailsMixin,
+    VisiblePostsMixin,
+    add_validators,
+    keyset_page,
+    list_validators,
+    not_modified,
+    post_validators,
+    remember_post_validators,
+    set_validators,
+)
+from .paginators import KeysetPaginator
+from .timelines import (
+    cached_author_id,
+    profile_author,
+    remember_author_id,
+    timeline_page,
+)
+from .views import PAGINATED_BY, post_comments
+
+
+async def get_user(request):
+    """Resolve the lazy request.user outside the event loop."""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def cached_page(request):
+    """Return ``(cache key, cached response)`` for anonymous GETs.
+
+    The key is None when the page must not be cached.
+    """
+    user = await get_user(request)
+    if request.method != "GET" or user.is_authenticated:
+        return None, None
+    key = page_cache_key(request)
+    entry = await sync_to_async(get_cached_page)(key)
+    if entry is None:
+        return key, None
+    return key, cached_response(entry)
+
+
+def page_response(request, template, context, cache_key, tags, timeout):
+    """Build a TemplateResponse that is page cached once rendered.
+
+    ``timeout`` is a callable, evaluated only when the page is stored.
+    """
+    response = TemplateResponse(request, template, context)
+    if cache_key is not None:
+        response.add_post_render_callback(
+            lambda rendered: set_cached_page(
+                cache_key, rendered, tags, timeout()
+            )
+        )
+    return response
+
+
+def conditional_list(view):
+    """Conditional GET for a post list, like ConditionalGetMixin."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await view(request, *args, **kwargs)
+        validators = await sync_to_async(list_validators)(request)
+        response = not_modified(request, validators)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return set_validators(response, validators)
+
+    return wrapper
+
+
+def list_context(page, **extra):
+    return {
+        "paginator": page.paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+        "object_list": page.object_list,
+        "post_list": page.object_list,
+        **extra,
+    }
+
+
+@conditional_list
+async def index(request):
+    cache_key, cached = await cached_page(request)
+    if cached is not None:
+        return cached
+    page = await sync_to_async(
+        lambda: keyset_page(
+            request,
+            VisiblePostsMixin.visible_posts_queryset(),
+            PAGINATED_BY,
+        )
+    )()
+    return page_response(
+        request, "blog/index.html", list_context(page),
+        cache_key, [FEED_TAG], lambda: PAGE_CACHE_TIMEOUT,
+    )
+
+
+@conditional_list
+async def category_posts(request, category_slug):
+    cache_key, cached = await cached_page(request)
+    if cached is not None:
+        return cached
+    # Categories come from the in-process lookup table, so there is no
+    # query to overlap with the posts query here.
+    category = await sync_to_async(published_category_by_slug)(
+        category_slug
+    )
+    if category is None:
+        raise Http404("Категория не найдена.")
+    page = await sync_to_async(
+        lambda: keyset_page(
+            request,
+            VisiblePostsMixin.visible_posts_queryset().filter(
+                category=category
+            ),
+            PAGINATED_BY,
+        )
+    )()
+    return page_response(
+        request, "blog/category.html", list_context(page, category=category),
+        cache_key, [FEED_TAG], lambda: PAGE_CACHE_TIMEOUT,
+    )
+
+
+@conditional_list
+async def profile(request, username):
+    user = await get_user(request)
+    owner = user.username == username
+
+    def timeline():
+        if owner:
+            return user, timeline_page(request, user.pk, True, PAGINATED_BY)
+        # With the author's id remembered the author and the page are
+        # fetched at once; a stale id is noticed and the page refetched.
+        author_id = cached_author_id(username)
+        if author_id is None:
+            author, page = profile_author(username, user), None
+        else:
+            author, page = run_concurrently(
+                lambda: profile_author(username, user),
+                lambda: timeline_page(
+                    request, author_id, False, PAGINATED_BY
+                ),
+            )
+        if author.pk != author_id:
+            remember_author_id(author)
+            page = timeline_page(request, author.pk, False, PAGINATED_BY)
+        return author, page
+
+    author, page = await sync_to_async(timeline)()
+    return TemplateResponse(
+        request, "blog/profile.html", list_context(page, profile=author)
+    )
+
+
+async def post_detail(request, pk):
+    validators = None
+    if request.method in ("GET", "HEAD"):
+        validators = await sync_to_async(post_validators)(request, pk)
+    if validators is not None:
+        response = not_modified(request, validators)
+        if response is not None:
+            return set_validators(response, validators)
+    cache_key, cached = await cached_page(request)
+    if cached is not None:
+        if validators is None:
+            return cached
+        return set_validators(cached, validators)
+    user = await get_user(request)
+    # Comments are fetched together with the post; if the post turns
+    # out to be hidden they are thrown away with the 404.
+    post, comments = await sync_to_async(run_concurrently)(
+        lambda: get_object_or_404(
+            PostDetailsMixin.post_details_queryset(author=user), pk=pk
+        ),
+        lambda: KeysetPaginator(
+            post_comments(pk),
+            COMMENTS_PER_PAGE,
+            keys=("created_at", "id"),
+            descending=False,
+        ).page(),
+    )
+    context = {
+        "object": post,
+        "post": post,
+        "form": CreateCommentForm(),
+        "comments": comments,
+    }
+    response = page_response(
+        request, "blog/detail.html", context,
+        cache_key, post_tags(post, comments), lambda: PAGE_CACHE_TIMEOUT,
+    )
+    if request.method not in ("GET", "HEAD"):
+        return response
+    if validators is None:
+        return add_validators(
+            response,
+            lambda: remember_post_validators(request, post, comments),
+        )
+    return set_validators(response, validators)
@@ -0,0 +1,258 @@
+"""Seeds a dataset and replays a mix of blog requests against it.
+
+Used by the ``benchmark`` management command and by the test suite.
+Query counts come from the Server-Timing header that
+InstrumentationMiddleware adds to every response.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from urllib.parse import urlencode
+
+from django.test import AsyncClient, Client
+from django.urls import resolve, reverse
+
+from .datagen import WORDS, generate_blog_data
+from .mixins import VisiblePostsMixin
+from .models import Category, User
+
+DATA_PREFIX = 'bench'
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+# Relative weights of the endpoints in the replayed traffic.
+REQUEST_MIX = {
+    'index': 30,
+    'post_detail': 25,
+    'category_posts': 12,
+    'profile': 12,
+    'comments': 10,
+    'search': 6,
+    'add_comment': 5,
+}
+# Pages served by blog.async_views as well.
+ASYNC_ENDPOINTS = ('index', 'post_detail', 'category_posts', 'profile')
+PERCENTILES = (50, 95, 99)
+
+
+def seed_dataset(users=50, categories=10, posts=2000, comments=10000,
+                 seed=0):
+    """Fill the current database with generated data and describe it."""
+    generate_blog_data(
+        users=users,
+        categories=categories,
+        locations=categories,
+        posts=posts,
+        comments=comments,
+        seed=seed,
+        prefix=DATA_PREFIX,
+    )
+    return {
+        'users': list(
+            User.objects.filter(username__startswith=f'{DATA_PREFIX}_user_')
+            .values_list('pk', flat=True)
+        ),
+        'categories': list(
+            Category.objects.filter(
+                slug__startswith=f'{DATA_PREFIX}-', is_published=True
+            ).values_list('slug', flat=True)
+        ),
+        # Only posts every visitor can open are requested.
+        'posts': list(
+            VisiblePostsMixin.visible_posts_queryset()
+            .filter(author__username__startswith=f'{DATA_PREFIX}_user_')
+            .values_list('pk', flat=True)
+        ),
+    }
+
+
+def build_requests(dataset, count, auth_ratio=0.3, seed=0,
+                   async_views=False):
+    """Return ``count`` (endpoint, authenticated, method, url) tuples.
+
+    With ``async_views`` the pages that have async versions are requested
+    from /async/.
+    """
+    rng = random.Random(seed)
+    usernames = dict(
+        User.objects.filter(pk__in=dataset['users'])
+        .values_list('pk', 'username')
+    )
+    endpoints = list(REQUEST_MIX)
+    weights = list(REQUEST_MIX.values())
+    requests = []
+    for endpoint in rng.choices(endpoints, weights, k=count):
+        authenticated = rng.random() < auth_ratio
+        method = 'get'
+        if endpoint == 'index':
+            url = reverse('blog:index')
+        elif endpoint == 'category_posts':
+            url = reverse(
+                'blog:category_posts', args=[rng.choice(dataset['categories'])]
+            )
+        elif endpoint == 'profile':
+            url = reverse(
+                'blog:profile', args=[rng.choice(list(usernames.values()))]
+            )
+        elif endpoint == 'search':
+            url = reverse('blog:search') + f'?q={rng.choice(WORDS)}'
+        elif endpoint == 'add_comment':
+            authenticated, method = True, 'post'
+            url = reverse(
+                'blog:add_comment', args=[rng.choice(dataset['posts'])]
+            )
+        else:
+            url = reverse(
+                f'blog:{endpoint}', args=[rng.choice(dataset['posts'])]
+            )
+        if async_views and endpoint in ASYNC_ENDPOINTS:
+            match = resolve(url)
+            url = reverse(
+                f'blog_async:{match.url_name}', kwargs=match.kwargs
+            )
+        requests.append((endpoint, authenticated, method, url))
+    return requests
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def record(samples, endpoint, url, response, elapsed):
+    if response.status_code >= 400:
+        raise RuntimeError(f'{url} вернул {response.status_code}')
+    match = QUERIES_RE.search(response.get('Server-Timing', ''))
+    samples.setdefault(endpoint, []).append(
+        (elapsed, int(match[1]) if match else 0)
+    )
+
+
+def request_kwargs(method):
+    if method != 'post':
+        return {}
+    # Form-encoded: the ASGI test client of Django 3.2 misreads
+    # multipart bodies.
+    return {
+        'data': urlencode({'text': 'Новый комментарий'}),
+        'content_type': 'application/x-www-form-urlencoded',
+    }
+
+
+def replay(requests, dataset, warmup=0):
+    """Send ``requests`` one by one through the WSGI test client."""
+    anonymous = Client()
+    authenticated = Client()
+    authenticated.force_login(User.objects.get(pk=dataset['users'][0]))
+    samples = {}
+    started = time.perf_counter()
+    for number, (endpoint, logged_in, method, url) in enumerate(requests):
+        client = authenticated if logged_in else anonymous
+        request_started = time.perf_counter()
+        response = getattr(client, method)(url, **request_kwargs(method))
+        elapsed = time.perf_counter() - request_started
+        if number < warmup:
+            started = time.perf_counter()
+            continue
+        record(samples, endpoint, url, response, elapsed)
+    return samples, time.perf_counter() - started
+
+
+def replay_concurrently(requests, dataset, concurrency, warmup=0):
+    """Send ``requests`` through the ASGI handler, like an ASGI server.
+
+    Up to ``concurrency`` requests are in flight at once. Warmup
+    requests go first, one by one.
+    """
+    anonymous = AsyncClient()
+    authenticated = AsyncClient()
+    authenticated.force_login(User.objects.get(pk=dataset['users'][0]))
+    clients = {False: anonymous, True: authenticated}
+    samples = {}
+    slots = None
+
+    async def send(endpoint, logged_in, method, url, measure=True):
+        async with slots:
+            request_started = time.perf_counter()
+            response = await getattr(clients[logged_in], method)(
+                url, **request_kwargs(method)
+            )
+            elapsed = time.perf_counter() - request_started
+        if measure:
+            record(samples, endpoint, url, response, elapsed)
+
+    async def main():
+        nonlocal slots
+        slots = asyncio.Semaphore(concurrency)
+        for request in requests[:warmup]:
+            await send(*request, measure=False)
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(send(*request) for request in requests[warmup:])
+        )
+        return time.perf_counter() - started
+
+    duration = asyncio.run(main())
+    return samples, duration
+
+
+def summarize(samples, duration):
+    """Reduce raw samples to latency percentiles and query counts."""
+    endpoints = {}
+    for endpoint, values in sorted(samples.items()):
+        latencies = [elapsed * 1000 for elapsed, _ in values]
+        queries = [count for _, count in values]
+        endpoints[endpoint] = {
+            'requests': len(values),
+            **{
+                f'p{percent}_ms': round(percentile(latencies, percent), 3)
+                for percent in PERCENTILES
+            },
+            'avg_queries': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+        }
+    total = sum(len(values) for values in samples.values())
+    return {
+        'requests': total,
+        'requests_per_second': round(total / duration, 1) if duration else 0,
+        'endpoints': endpoints,
+    }
+
+
+def find_regressions(report, baseline, tolerance):
+    """Compare ``report`` with a saved one.
+
+    p95 latency may grow by ``tolerance`` percent; query counts may not
+    grow at all.
+    """
+    regressions = []
+    for endpoint, stats in report['endpoints'].items():
+        previous = baseline['endpoints'].get(endpoint)
+        if previous is None:
+            continue
+        limit = previous['p95_ms'] * (1 + tolerance / 100)
+        if stats['p95_ms'] > limit:
+            regressions.append(
+                f'{endpoint}: p95 {stats["p95_ms"]} мс, '
+                f'было {previous["p95_ms"]} мс'
+            )
+        if stats['max_queries'] > previous['max_queries']:
+            regressions.append(
+                f'{endpoint}: {stats["max_queries"]} SQL-запросов, '
+                f'было {previous["max_queries"]}'
+            )
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2)
@@ -0,0 +1,143 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+VERSION_KEY = "blog:version:{}"
+PAGE_KEY = "blog:page:{}"
+FEED_TAG = "feed"
+POSTS_TAG = "posts"
+CACHED_HEADERS = ("ETag", "Last-Modified", "Vary")
+
+
+def post_tags(post, comments=()):
+    """Cache tags of everything a rendered post depends on.
+
+    A post page also shows the names of the authors of ``comments``.
+    """
+    tags = [
+        f"post:{post.pk}",
+        f"user:{post.author_id}",
+        f"category:{post.category_id}",
+        f"location:{post.location_id}",
+    ]
+    for author_id in dict.fromkeys(
+        comment.author_id for comment in comments
+    ):
+        if f"user:{author_id}" not in tags:
+            tags.append(f"user:{author_id}")
+    return tags
+
+
+def post_feed_tags(category_id, author_id):
+    """Cache tags of the syndication feeds a post appears in."""
+    return [
+        POSTS_TAG,
+        f"posts:category:{category_id}",
+        f"posts:author:{author_id}",
+    ]
+
+
+def get_versions(tags):
+    """Return the current version token of every tag.
+
+    Tags without a stored version (never seen or evicted) get a fresh
+    token, so a lost version can never resurrect stale cached content.
+    """
+    keys = {tag: VERSION_KEY.format(tag) for tag in tags}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    missing = {}
+    for tag, key in keys.items():
+        if key in stored:
+            versions[tag] = stored[key]
+        else:
+            versions[tag] = missing[key] = time.time_ns()
+    if missing:
+        cache.set_many(missing, timeout=None)
+    return versions
+
+
+def bump_versions(*tags):
+    """Invalidate every cache entry built from the given tags."""
+    token = time.time_ns()
+    cache.set_many(
+        {VERSION_KEY.format(tag): token for tag in tags}, timeout=None
+    )
+
+
+def invalidate(*tags):
+    """Bump tags now and again once the current transaction commits.
+
+    The second bump drops entries rebuilt from not yet committed data
+    by concurrent requests.
+    """
+    bump_versions(*tags)
+    transaction.on_commit(lambda: bump_versions(*tags))
+
+
+def following_tag(user_id):
+    """Tag of everything built from the authors a user follows."""
+    return f"follows:{user_id}"
+
+
+def versioned_key(prefix, tags, versions=None):
+    """Key of ``prefix`` at the current versions of ``tags``.
+
+    ``versions`` may hold the tag versions already fetched for a batch
+    of keys with get_versions().
+    """
+    if versions is None:
+        versions = get_versions(tags)
+    digest = hashlib.md5(
+        ":".join(f"{tag}={versions[tag]}" for tag in tags).encode()
+    ).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def page_cache_key(request):
+    return PAGE_KEY.format(
+        hashlib.md5(request.get_full_path().encode()).hexdigest()
+    )
+
+
+def get_cached_page(key):
+    """Return the cached page body if none of its tags changed since."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if get_versions(list(entry["versions"])) != entry["versions"]:
+        return None
+    return entry
+
+
+def set_cached_page(key, response, tags, timeout):
+    cache.set(
+        key,
+        {
+            "versions": get_versions(tags),
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "headers": {
+                header: response[header]
+                for header in CACHED_HEADERS
+                if response.has_header(header)
+            },
+        },
+        timeout,
+    )
+
+
+def cached_response(entry):
+    """Rebuild the response stored by set_cached_page()."""
+    response = HttpResponse(
+        entry["content"], content_type=entry["content_type"]
+    )
+    for header, value in entry.get("headers", {}).items():
+        response[header] = value
+    # Cached pages are only served to anonymous visitors.
+    patch_vary_headers(response, ("Cookie",))
+    return response
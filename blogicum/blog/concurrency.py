@@ -0,0 +1,35 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from config import QUERY_WORKERS
+
+_executor = ThreadPoolExecutor(
+    max_workers=QUERY_WORKERS, thread_name_prefix='blog-queries'
+)
+
+
+def _call(function):
+    try:
+        return function()
+    finally:
+        close_old_connections()
+
+
+def run_concurrently(*functions):
+    """Call the blocking ``functions`` at once and return their results.
+
+    Each one runs in a pool thread with its own database connection and
+    a copy of the caller's context variables (query timer, primary pin).
+    With settings.CONCURRENT_QUERIES off they run one after another in
+    the calling thread instead. The first exception is re-raised.
+    """
+    if not settings.CONCURRENT_QUERIES:
+        return [function() for function in functions]
+    futures = [
+        _executor.submit(contextvars.copy_context().run, _call, function)
+        for function in functions
+    ]
+    return [future.result() for future in futures]
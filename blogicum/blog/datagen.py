@@ -0,0 +1,225 @@
+"""Synthetic blog data at production volumes.
+
+Rows are written with bulk_create in batches, each batch in its own
+transaction, so millions of rows take minutes. The data is skewed the
+way real traffic is: a few authors write most posts, a few posts get
+most comments, some posts are scheduled for the future and some
+categories and locations are hidden.
+
+bulk_create skips model signals, so comment counters are computed up
+front and caches are bumped once at the end. The search index is not
+touched; rebuild it with ``rebuild_search_index``.
+"""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import FEED_TAG, POSTS_TAG, bump_versions
+from .lookups import CATEGORIES_TAG, LOCATIONS_TAG
+from .models import Category, Comment, Location, Post, User
+
+WORDS = (
+    'город', 'море', 'утро', 'дорога', 'история', 'путешествие', 'вечер',
+    'книга', 'река', 'лес', 'музей', 'поезд', 'зима', 'лето', 'друг',
+    'кофе', 'работа', 'проект', 'горы', 'закат', 'рынок', 'улица', 'дом',
+    'праздник', 'мост', 'парк', 'осень', 'весна', 'ночь', 'фотография',
+    'новый', 'старый', 'красивый', 'долгий', 'тихий', 'шумный', 'первый',
+    'увидел', 'нашли', 'гуляли', 'решил', 'вернулись', 'рассказал',
+)
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Пётр', 'Елена', 'Олег', 'Ольга')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов')
+TEXT_POOL_SIZE = 500
+
+# Share of hidden categories, hidden locations, hidden posts, posts
+# scheduled for the future and posts without a location.
+UNPUBLISHED_CATEGORIES = 0.1
+UNPUBLISHED_LOCATIONS = 0.05
+UNPUBLISHED_POSTS = 0.03
+SCHEDULED_POSTS = 0.02
+POSTS_WITHOUT_LOCATION = 0.3
+# Zipf exponents: the larger, the more skewed.
+AUTHOR_SKEW = 1.1
+COMMENT_SKEW = 1.2
+CATEGORY_SKEW = 0.8
+
+
+def zipf_weights(count, skew):
+    """Cumulative Zipf weights for use with ``random.choices``."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def insert(model, objects, batch_size, progress=None, total=None):
+    """bulk_create ``objects`` batch by batch; return the new pks in order."""
+    pks = []
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            last_pk = (
+                model.objects.order_by('-pk')
+                .values_list('pk', flat=True).first()
+            ) or 0
+            created = model.objects.bulk_create(batch)
+            if connection.features.can_return_rows_from_bulk_insert:
+                pks.extend(obj.pk for obj in created)
+            else:
+                pks.extend(
+                    model.objects.filter(pk__gt=last_pk)
+                    .order_by('pk').values_list('pk', flat=True)
+                )
+        batch.clear()
+        if progress:
+            progress(model, len(pks), total)
+
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return pks
+
+
+def generate_blog_data(users=1000, categories=50, locations=200,
+                       posts=100000, comments=500000, seed=0,
+                       batch_size=5000, prefix='gen', password=None,
+                       days=3 * 365, progress=None):
+    """Write a synthetic blog into the default database.
+
+    ``progress(model, done, total)`` is called after every batch.
+    Returns the number of created rows per model.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    texts = [
+        ' '.join(rng.choices(WORDS, k=rng.randint(20, 120))).capitalize()
+        for _ in range(TEXT_POOL_SIZE)
+    ]
+
+    hashed_password = make_password(password)
+    user_pks = insert(
+        User,
+        (
+            User(
+                username=f'{prefix}_user_{number}',
+                email=f'{prefix}_user_{number}@example.com',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=hashed_password,
+            )
+            for number in range(users)
+        ),
+        batch_size, progress, users,
+    )
+    category_pks = insert(
+        Category,
+        (
+            Category(
+                title=f'Категория {number}',
+                description=rng.choice(texts),
+                slug=f'{prefix}-category-{number}',
+                is_published=rng.random() >= UNPUBLISHED_CATEGORIES,
+            )
+            for number in range(categories)
+        ),
+        batch_size, progress, categories,
+    )
+    location_pks = insert(
+        Location,
+        (
+            Location(
+                name=f'Место {number}',
+                is_published=rng.random() >= UNPUBLISHED_LOCATIONS,
+            )
+            for number in range(locations)
+        ),
+        batch_size, progress, locations,
+    )
+
+    # Hot authors, popular categories and viral posts are random rows,
+    # not simply the first ones.
+    rng.shuffle(user_pks)
+    rng.shuffle(category_pks)
+    author_weights = zipf_weights(len(user_pks), AUTHOR_SKEW)
+    category_weights = zipf_weights(len(category_pks), CATEGORY_SKEW)
+    viral_order = list(range(posts))
+    rng.shuffle(viral_order)
+    comment_weights = zipf_weights(posts, COMMENT_SKEW)
+
+    # The same seeded sequence picks comment targets twice: first to
+    # preset comment_count, then to create the comments themselves.
+    comment_seed = rng.random()
+
+    def comment_targets():
+        targets = random.Random(comment_seed)
+        remaining = comments
+        while remaining:
+            size = min(batch_size, remaining)
+            yield from targets.choices(
+                viral_order, cum_weights=comment_weights, k=size
+            )
+            remaining -= size
+
+    comment_counts = [0] * posts
+    if posts:
+        for index in comment_targets():
+            comment_counts[index] += 1
+
+    start = now - timedelta(days=days)
+    step = timedelta(days=days) / max(posts, 1)
+
+    def make_posts():
+        for number in range(posts):
+            if rng.random() < SCHEDULED_POSTS:
+                pub_date = now + timedelta(minutes=rng.randint(1, 30 * 1440))
+            else:
+                pub_date = min(
+                    start + step * number
+                    + timedelta(minutes=rng.randint(-720, 720)),
+                    now,
+                )
+            yield Post(
+                title=f'Заметка {number}: {rng.choice(WORDS)}',
+                text=rng.choice(texts),
+                pub_date=pub_date,
+                author_id=rng.choices(user_pks, cum_weights=author_weights)[0],
+                category_id=rng.choices(
+                    category_pks, cum_weights=category_weights
+                )[0],
+                location_id=(
+                    rng.choice(location_pks)
+                    if location_pks
+                    and rng.random() >= POSTS_WITHOUT_LOCATION
+                    else None
+                ),
+                is_published=rng.random() >= UNPUBLISHED_POSTS,
+                is_live=pub_date <= now,
+                comment_count=comment_counts[number],
+            )
+
+    post_pks = insert(Post, make_posts(), batch_size, progress, posts)
+    comment_texts = texts[:50]
+    insert(
+        Comment,
+        (
+            Comment(
+                text=rng.choice(comment_texts),
+                post_id=post_pks[index],
+                author_id=rng.choices(user_pks, cum_weights=author_weights)[0],
+            )
+            for index in (comment_targets() if posts else ())
+        ),
+        batch_size, progress, comments,
+    )
+    bump_versions(CATEGORIES_TAG, LOCATIONS_TAG, FEED_TAG, POSTS_TAG)
+    return {
+        User: len(user_pks),
+        Category: len(category_pks),
+        Location: len(location_pks),
+        Post: len(post_pks),
+        Comment: comments if posts else 0,
+    }
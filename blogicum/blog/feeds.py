@@ -0,0 +1,190 @@
+"""RSS and Atom feeds of the site, of a category and of an author.
+
+A generated feed is cached under a key built from the version tokens of
+its tags, so it is rebuilt only after a post it may list changes (see
+blog.signals). Responses carry ETag and Last-Modified headers and
+pollers that already have the current feed get 304 Not Modified.
+"""
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from .cache import POSTS_TAG, versioned_key
+from .lookups import CATEGORIES_TAG, published_category_by_slug
+from .mixins import VisiblePostsMixin
+from .models import User
+from config import FEED_CACHE_TIMEOUT, FEED_DESCRIPTION_WORDS, FEED_ITEMS
+
+FEED_KEY = "blog:feed:{}"
+FEED_TAGS_KEY = "blog:feed-tags:{}"
+
+
+class PostFeed(Feed):
+    """RSS feed of the newest visible posts of the whole site."""
+
+    def get_feed_tags(self, obj):
+        return [POSTS_TAG, CATEGORIES_TAG]
+
+    def get_author_tags(self, obj):
+        """Tags of the authors the feed names, known once it is built."""
+        tags = self.get_feed_tags(obj)
+        return [
+            f"user:{author_id}"
+            for author_id in dict.fromkeys(
+                self.items(obj).values_list("author_id", flat=True)
+            )
+            if f"user:{author_id}" not in tags
+        ]
+
+    def get_posts(self, obj):
+        return VisiblePostsMixin.visible_posts_queryset()
+
+    def title(self, obj):
+        return "Блогикум"
+
+    def description(self, obj):
+        return "Новые публикации Блогикума"
+
+    def link(self, obj):
+        return reverse("blog:index")
+
+    def items(self, obj):
+        return self.get_posts(obj)[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(FEED_DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse("blog:post_detail", args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+    def build(self, request, obj):
+        feed = self.get_feed(obj, request)
+        content = feed.writeString("utf-8").encode()
+        return {
+            "content": content,
+            "content_type": feed.content_type,
+            "etag": quote_etag(hashlib.md5(content).hexdigest()),
+            "last_modified": feed.latest_post_date().timestamp(),
+        }
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        # Links in the feed are absolute, so the scheme and host are
+        # part of the key.
+        url = request.build_absolute_uri(request.path)
+        # The feed also depends on its authors, which are only known
+        # after it is built; their tags are kept under a key of their own.
+        tags_key = versioned_key(
+            FEED_TAGS_KEY.format(url), self.get_feed_tags(obj)
+        )
+        tags = cache.get(tags_key)
+        entry = None
+        if tags is not None:
+            entry = cache.get(versioned_key(FEED_KEY.format(url), tags))
+        if entry is None:
+            tags = self.get_feed_tags(obj) + self.get_author_tags(obj)
+            entry = self.build(request, obj)
+            cache.set(tags_key, tags, FEED_CACHE_TIMEOUT)
+            cache.set(
+                versioned_key(FEED_KEY.format(url), tags),
+                entry,
+                FEED_CACHE_TIMEOUT,
+            )
+        response = get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=int(entry["last_modified"]),
+        )
+        if response is None:
+            response = HttpResponse(
+                entry["content"], content_type=entry["content_type"]
+            )
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        return response
+
+
+class CategoryPostFeed(PostFeed):
+    """RSS feed of the newest visible posts of a category."""
+
+    def get_object(self, request, category_slug):
+        category = published_category_by_slug(category_slug)
+        if category is None:
+            raise Http404("Категория не найдена.")
+        return category
+
+    def get_feed_tags(self, obj):
+        return [f"posts:category:{obj.pk}", f"category:{obj.pk}"]
+
+    def get_posts(self, obj):
+        return super().get_posts(obj).filter(category=obj)
+
+    def title(self, obj):
+        return f"Блогикум: {obj.title}"
+
+    def description(self, obj):
+        return f"Новые публикации в категории {obj.title}"
+
+    def link(self, obj):
+        return reverse("blog:category_posts", args=[obj.slug])
+
+
+class AuthorPostFeed(PostFeed):
+    """RSS feed of the newest visible posts of an author."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_feed_tags(self, obj):
+        return [f"posts:author:{obj.pk}", f"user:{obj.pk}", CATEGORIES_TAG]
+
+    def get_posts(self, obj):
+        return super().get_posts(obj).filter(author=obj)
+
+    def title(self, obj):
+        return f"Блогикум: {obj.get_full_name() or obj.username}"
+
+    def description(self, obj):
+        return f"Новые публикации пользователя {obj.username}"
+
+    def link(self, obj):
+        return reverse("blog:profile", args=[obj.username])
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AtomPostFeed(AtomFeedMixin, PostFeed):
+    pass
+
+
+class AtomCategoryPostFeed(AtomFeedMixin, CategoryPostFeed):
+    pass
+
+
+class AtomAuthorPostFeed(AtomFeedMixin, AuthorPostFeed):
+    pass
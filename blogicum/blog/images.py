@@ -0,0 +1,72 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from config import IMAGE_DERIVATIVE_WIDTHS
+
+FORMATS = {
+    'jpeg': ('.jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': ('.webp', {'quality': 80, 'method': 4}),
+}
+
+
+def derivative_name(name, size, image_format):
+    """img/cat.png -> img/cat.png.card.webp, next to the original file.
+
+    The original extension stays in the name, so img/cat.jpg gets copies
+    of its own.
+    """
+    return f'{name}.{size}{FORMATS[image_format][0]}'
+
+
+def generate_derivatives(name, storage=default_storage):
+    """Write every sized JPEG and WebP copy of the stored image ``name``.
+
+    Sizes wider than the original are skipped instead of upscaled.
+    """
+    with storage.open(name) as source:
+        original = Image.open(source)
+        original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+    created = []
+    for size, width in IMAGE_DERIVATIVE_WIDTHS.items():
+        if width > original.width:
+            continue
+        resized = original.copy()
+        resized.thumbnail((width, original.height), Image.Resampling.LANCZOS)
+        for image_format, (_, params) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=image_format.upper(), **params)
+            target = derivative_name(name, size, image_format)
+            if storage.exists(target):
+                storage.delete(target)
+            created.append(
+                storage.save(target, ContentFile(buffer.getvalue()))
+            )
+    return created
+
+
+def delete_derivatives(name, storage=default_storage):
+    """Remove every sized copy of the image ``name``; return their names."""
+    deleted = []
+    for size in IMAGE_DERIVATIVE_WIDTHS:
+        for image_format in FORMATS:
+            target = derivative_name(name, size, image_format)
+            if storage.exists(target):
+                storage.delete(target)
+                deleted.append(target)
+    return deleted
+
+
+def available_derivatives(name, storage=default_storage):
+    """Return ``{format: [(url, width), ...]}`` for derivatives on disk."""
+    result = {image_format: [] for image_format in FORMATS}
+    for size, width in IMAGE_DERIVATIVE_WIDTHS.items():
+        for image_format in FORMATS:
+            target = derivative_name(name, size, image_format)
+            if storage.exists(target):
+                result[image_format].append((storage.url(target), width))
+    return result
@@ -0,0 +1,52 @@
+import threading
+
+from .cache import get_versions
+from .models import Category, Location
+
+CATEGORIES_TAG = "categories"
+LOCATIONS_TAG = "locations"
+
+
+class LookupTable:
+    """Process-wide copy of a small, rarely changed table.
+
+    Every access compares the local copy with the shared version token
+    of ``tag`` (one cache read) and reloads the whole table when another
+    process has bumped it through the model signals.
+    """
+
+    def __init__(self, model, tag):
+        self.model = model
+        self.tag = tag
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._version = None
+
+    def rows(self):
+        version = get_versions([self.tag])[self.tag]
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._rows = {
+                        obj.pk: obj for obj in self.model.objects.all()
+                    }
+                    self._version = version
+        return self._rows
+
+    def get(self, pk):
+        return self.rows().get(pk)
+
+
+categories = LookupTable(Category, CATEGORIES_TAG)
+locations = LookupTable(Location, LOCATIONS_TAG)
+
+
+def published_category_ids():
+    return [pk for pk, obj in categories.rows().items() if obj.is_published]
+
+
+def published_category_by_slug(slug):
+    for category in categories.rows().values():
+        if category.slug == slug and category.is_published:
+            return category
+    return None
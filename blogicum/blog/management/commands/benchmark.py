@@ -0,0 +1,139 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from blog import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет временную тестовую базу данными, воспроизводит смесь '
+        'запросов анонимных и вошедших пользователей ко всем страницам '
+        'блога и печатает задержки (p50/p95/p99), число запросов в секунду '
+        'и количество SQL-запросов. Рабочая база не затрагивается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Сколько запросов отправить после прогрева.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=100,
+            help='Сколько первых запросов не учитывать в результатах.',
+        )
+        parser.add_argument(
+            '--auth-ratio',
+            type=float,
+            default=0.3,
+            help='Доля запросов от вошедшего пользователя.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=0,
+            help='Отправлять запросы через ASGI-обработчик, не больше '
+                 'указанного числа одновременно. По умолчанию запросы '
+                 'идут по одному через WSGI.',
+        )
+        parser.add_argument(
+            '--async-views',
+            action='store_true',
+            help='Запрашивать асинхронные версии страниц (/async/).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-файл прошлого замера для поиска регрессий.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=20,
+            help='Допустимый рост p95 относительно --baseline, в процентах.',
+        )
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity, interactive=False)
+        try:
+            report = self.run(options)
+        finally:
+            teardown_databases(old_config, verbosity)
+            teardown_test_environment()
+
+        self.print_report(report)
+        if options['output']:
+            benchmark.save_report(report, options['output'])
+        if options['baseline']:
+            regressions = benchmark.find_regressions(
+                report,
+                benchmark.load_report(options['baseline']),
+                options['tolerance'],
+            )
+            if regressions:
+                raise CommandError(
+                    'Найдены регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий не найдено.'))
+
+    def run(self, options):
+        dataset = benchmark.seed_dataset(
+            users=options['users'],
+            categories=options['categories'],
+            posts=options['posts'],
+            comments=options['comments'],
+            seed=options['seed'],
+        )
+        requests = benchmark.build_requests(
+            dataset,
+            options['warmup'] + options['requests'],
+            auth_ratio=options['auth_ratio'],
+            seed=options['seed'],
+            async_views=options['async_views'],
+        )
+        if options['concurrency']:
+            samples, duration = benchmark.replay_concurrently(
+                requests,
+                dataset,
+                options['concurrency'],
+                warmup=options['warmup'],
+            )
+        else:
+            samples, duration = benchmark.replay(
+                requests, dataset, warmup=options['warmup']
+            )
+        return benchmark.summarize(samples, duration)
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{"Страница":<16}{"запросов":>10}{"p50, мс":>10}'
+            f'{"p95, мс":>10}{"p99, мс":>10}{"SQL ср.":>9}{"SQL макс.":>11}'
+        )
+        for endpoint, stats in report['endpoints'].items():
+            self.stdout.write(
+                f'{endpoint:<16}{stats["requests"]:>10}'
+                f'{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}'
+                f'{stats["p99_ms"]:>10.2f}{stats["avg_queries"]:>9.2f}'
+                f'{stats["max_queries"]:>11}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего запросов: {report["requests"]}, '
+            f'{report["requests_per_second"]} в секунду'
+        ))
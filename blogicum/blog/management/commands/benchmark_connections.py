@@ -0,0 +1,81 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.benchmark import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает накладные расходы на соединение с базой данных '
+        'в цикле запроса без пула соединений и с ним.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Сколько запросов выполнить в каждом режиме.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not hasattr(connection, 'pool'):
+            raise CommandError(
+                'База данных подключена без пула: укажите движок '
+                'из blogicum.db.backends.'
+            )
+        if connection.is_in_memory_db():
+            raise CommandError('Соединения с базой в памяти не закрываются.')
+        pool = connection.pool
+        size = pool.size
+        # Every request must give its connection up, as it does with
+        # the default CONN_MAX_AGE = 0.
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        connection.settings_dict['CONN_MAX_AGE'] = 0
+        connection.close()
+        try:
+            self.stdout.write(
+                f'{"Режим":<12}{"p50, мс":>10}{"p95, мс":>10}'
+                f'{"соединений":>12}{"на соединение, мс":>20}'
+            )
+            for label, pool_size in (('без пула', 0), ('с пулом', size or 1)):
+                self.report(label, self.run(
+                    connection, pool, pool_size, options['requests']
+                ))
+        finally:
+            connection.close()
+            pool.size = size
+            pool.clear()
+            pool.reset_stats()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+
+    def run(self, connection, pool, pool_size, count):
+        pool.size = pool_size
+        pool.clear()
+        pool.reset_stats()
+        samples = []
+        for _ in range(count):
+            started = perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            request_finished.send(sender=self.__class__)
+            samples.append(perf_counter() - started)
+        return samples, pool.snapshot()
+
+    def report(self, label, result):
+        samples, stats = result
+        per_connection = (
+            stats['connect_seconds'] / stats['opened'] * 1000
+            if stats['opened'] else 0
+        )
+        self.stdout.write(
+            f'{label:<12}{percentile(samples, 50) * 1000:>10.3f}'
+            f'{percentile(samples, 95) * 1000:>10.3f}'
+            f'{stats["opened"]:>12}{per_connection:>20.3f}'
+        )
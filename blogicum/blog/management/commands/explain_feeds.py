@@ -0,0 +1,113 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.mixins import VisiblePostsMixin
+from blog.models import Comment, Post
+from blog.paginators import KeysetPaginator
+
+FEED_PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы выполнения и время запросов лент публикаций. '
+        'С флагом --compare дополнительно показывает планы без индексов '
+        'лент: индексы временно удаляются и создаются заново, поэтому '
+        'запускайте сравнение только на базе для замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Сравнить планы с индексами лент и без них.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз выполнять каждый запрос для замера.',
+        )
+
+    def handle(self, *args, **options):
+        queries = self.feed_queries()
+        if not options['compare']:
+            self.report(queries, options['repeat'])
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING('С индексами'))
+        self.report(queries, options['repeat'])
+        self.alter_feed_indexes('remove_index')
+        try:
+            self.stdout.write(self.style.MIGRATE_HEADING('Без индексов'))
+            self.report(queries, options['repeat'])
+        finally:
+            self.alter_feed_indexes('add_index')
+
+    def feed_queries(self):
+        visible = VisiblePostsMixin.visible_posts_queryset()
+        paginator = KeysetPaginator(visible, FEED_PAGE_SIZE)
+        queries = {'Главная, первая страница': visible[:FEED_PAGE_SIZE + 1]}
+
+        middle = visible.count() // 2
+        middle_post = visible[middle:middle + 1].first()
+        if middle_post is not None:
+            queries['Главная, середина ленты'] = (
+                visible.filter(paginator.seek_filter(
+                    [middle_post.pub_date, middle_post.id], descending=True
+                ))[:FEED_PAGE_SIZE + 1]
+            )
+
+        category_id = visible.values_list('category', flat=True).first()
+        if category_id is not None:
+            queries['Страница категории'] = (
+                visible.filter(category=category_id)[:FEED_PAGE_SIZE + 1]
+            )
+
+        author_id = visible.values_list('author', flat=True).first()
+        if author_id is not None:
+            queries['Профиль автора'] = (
+                visible.filter(author=author_id)[:FEED_PAGE_SIZE + 1]
+            )
+
+        post_id = (
+            Post.objects.order_by('-comment_count')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if post_id is not None:
+            queries['Комментарии к публикации'] = (
+                Comment.objects.filter(post=post_id)
+                .select_related('author')
+                .order_by('created_at', 'id')[:FEED_PAGE_SIZE + 1]
+            )
+        return queries
+
+    def report(self, queries, repeat):
+        for title, queryset in queries.items():
+            best = min(self.measure(queryset) for _ in range(repeat))
+            self.stdout.write(self.style.SUCCESS(
+                f'{title}: {best * 1000:.2f} мс'
+            ))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
+
+    @staticmethod
+    def measure(queryset):
+        started = time.perf_counter()
+        list(queryset._chain())
+        return time.perf_counter() - started
+
+    @staticmethod
+    def alter_feed_indexes(operation):
+        with connection.schema_editor() as schema_editor:
+            for model in (Post, Comment):
+                for index in model._meta.indexes:
+                    getattr(schema_editor, operation)(model, index)
+        # Drop cached prepared statements so the planner sees the change.
+        # A pooled connection would keep them, so it is not given back.
+        if hasattr(connection, 'pool') and connection.connection is not None:
+            connection.pool.discard(connection.connection)
+            connection.connection = None
+        connection.close()
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from blog.transfer import FORMATS, export_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает пользователей, категории, местоположения, '
+        'публикации и комментарии в каталог: по файлу NDJSON или CSV на '
+        'модель и изображения в подкаталоге media. Прерванная выгрузка '
+        'продолжается с последней контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для выгрузки.')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за один раз.',
+        )
+        parser.add_argument(
+            '--no-media',
+            action='store_true',
+            help='Не копировать файлы изображений.',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать заново, не используя контрольную точку.',
+        )
+
+    def handle(self, *args, **options):
+        totals = export_data(
+            options['directory'],
+            data_format=options['format'],
+            batch_size=options['batch_size'],
+            media=not options['no_media'],
+            restart=options['restart'],
+            progress=self.progress if options['verbosity'] > 1 else None,
+        )
+        for model, count in totals.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена.'))
+
+    def progress(self, model, rows):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {rows}')
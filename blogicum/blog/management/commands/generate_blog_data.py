@@ -0,0 +1,79 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.datagen import generate_blog_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные блога в объёмах рабочей базы: '
+        'пользователей, категории, местоположения, публикации и '
+        'комментарии с реалистичным перекосом (популярные авторы, '
+        'вирусные публикации, отложенные публикации, скрытые категории).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=3000000)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='gen',
+            help='Префикс имён пользователей и слагов категорий.',
+        )
+        parser.add_argument(
+            '--password',
+            help='Общий пароль созданных пользователей. '
+                 'Без него войти под ними нельзя.',
+        )
+        parser.add_argument(
+            '--reindex',
+            action='store_true',
+            help='Перестроить поисковый индекс после генерации.',
+        )
+
+    def handle(self, *args, **options):
+        if options['posts'] and not (
+            options['users'] and options['categories']
+        ):
+            raise CommandError(
+                'Для публикаций нужны хотя бы один пользователь '
+                'и одна категория.'
+            )
+        self.started = time.perf_counter()
+        created = generate_blog_data(
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments=options['comments'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            password=options['password'],
+            progress=self.progress if options['verbosity'] > 1 else None,
+        )
+        for model, count in created.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+        if options['reindex']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - self.started:.1f} с.'
+        ))
+
+    def progress(self, model, done, total):
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {done}/{total} '
+            f'({time.perf_counter() - self.started:.1f} с)'
+        )
@@ -0,0 +1,50 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from blog.transfer import FORMATS, import_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает данные, выгруженные командой export_blog_data. '
+        'Строки с существующими первичными ключами обновляются, новые '
+        'создаются. Прерванная загрузка продолжается с последней '
+        'контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог с выгрузкой.')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько строк сохранять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать заново, не используя контрольную точку.',
+        )
+        parser.add_argument(
+            '--reindex',
+            action='store_true',
+            help='Перестроить поисковый индекс после загрузки.',
+        )
+
+    def handle(self, *args, **options):
+        totals = import_data(
+            options['directory'],
+            data_format=options['format'],
+            batch_size=options['batch_size'],
+            restart=options['restart'],
+            progress=self.progress if options['verbosity'] > 1 else None,
+        )
+        for model, count in totals.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+        if options['reindex']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
+
+    def progress(self, model, rows):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {rows}')
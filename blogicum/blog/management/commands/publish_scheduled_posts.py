@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.publishing import next_pub_date, publish_due_posts
+from config import PUBLISH_LOOP_INTERVAL
+
+
+class Command(BaseCommand):
+    help = (
+        'Выпускает отложенные публикации, у которых наступили дата '
+        'и время публикации, и сбрасывает показывающие их кеши.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, просыпаясь к следующей публикации.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=PUBLISH_LOOP_INTERVAL,
+            help='Наибольшая пауза между проверками в режиме --loop, сек.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts()
+            if published or not options['loop']:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Выпущено публикаций: {published}')
+                )
+            if not options['loop']:
+                return
+            time.sleep(self.pause(options['interval']))
+            close_old_connections()
+
+    @staticmethod
+    def pause(interval):
+        """Sleep until the next deferred post, but no longer than interval."""
+        pub_date = next_pub_date()
+        if pub_date is None:
+            return interval
+        seconds = (pub_date - timezone.now()).total_seconds()
+        return min(interval, max(seconds, 0.1))
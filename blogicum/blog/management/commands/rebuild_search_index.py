@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Comment, Post
+from blog.search import get_backend, index_comment, index_post
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс публикаций и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько объектов индексировать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        get_backend().clear()
+        for model, index in ((Post, index_post), (Comment, index_comment)):
+            total = self.reindex(model, index, options['batch_size'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {total}')
+        self.stdout.write(self.style.SUCCESS('Индекс перестроен.'))
+
+    @staticmethod
+    def reindex(model, index, batch_size):
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return total
+            with transaction.atomic():
+                for obj in batch:
+                    index(obj)
+            total += len(batch)
+            last_pk = batch[-1].pk
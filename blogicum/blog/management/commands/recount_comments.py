@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import FEED_TAG, bump_versions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Сколько публикаций пересчитывать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        repaired = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                batch_repaired = Post.objects.filter(
+                    pk__in=pks
+                ).recount_comments()
+            if batch_repaired:
+                bump_versions(FEED_TAG, *(f'post:{pk}' for pk in pks))
+            repaired += batch_repaired
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено публикаций: {repaired}')
+        )
@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from blogicum.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу во все файлы реплик '
+        '(BLOGICUM_DB_REPLICAS) для локальной проверки маршрутизации.'
+    )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if 'sqlite3' not in primary['ENGINE']:
+            raise CommandError('Команда работает только с SQLite.')
+        replicas = replica_aliases()
+        if not replicas:
+            raise CommandError('Реплики не настроены: BLOGICUM_DB_REPLICAS.')
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in replicas:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: скопировано')
+        finally:
+            source.close()
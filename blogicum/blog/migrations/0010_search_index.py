@@ -0,0 +1,37 @@
+from django.db import migrations
+
+SQLITE_CREATE = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS blog_search USING fts5('
+    'title, body, post_id UNINDEXED, tokenize = "unicode61")'
+)
+POSTGRES_CREATE = (
+    'CREATE TABLE IF NOT EXISTS blog_search ('
+    'id bigint PRIMARY KEY, post_id bigint NOT NULL, document tsvector)',
+    'CREATE INDEX IF NOT EXISTS blog_search_document_idx '
+    'ON blog_search USING GIN (document)',
+)
+
+
+def create_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS blog_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:06
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_is_live(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(pub_date__lte=timezone.now()).update(is_live=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_modification_tracking'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_visible_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_live',
+            field=models.BooleanField(default=False, editable=False, help_text='Дата и время публикации наступили; отложенные публикации выпускает publish_scheduled_posts.', verbose_name='Вышла'),
+        ),
+        migrations.RunPython(fill_is_live, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_live', True), ('is_published', True)), fields=['-pub_date', '-id'], name='post_live_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_live', False)), fields=['pub_date'], name='post_pending_idx'),
+        ),
+    ]
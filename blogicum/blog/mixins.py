@@ -1,7 +1,30 @@
+import hashlib
+
+from .cache import (
+    FEED_TAG,
+    cached_response,
+    following_tag,
+    get_cached_page,
+    get_versions,
+    page_cache_key,
+    post_tags,
+    set_cached_page,
+    versioned_key,
+)
+from .concurrency import run_concurrently
+from .lookups import published_category_ids
 from .models import Comment, Post
+from .paginators import InvalidCursor, KeysetPaginator
+from config import PAGE_CACHE_TIMEOUT
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
 from django.urls import reverse
 from django.db.models import Q
-from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+POST_VALIDATOR_TAGS_KEY = "blog:validator-tags:post:{}"
 
 
 class PostsEditMixin:
@@ -13,6 +36,16 @@ class PostsEditMixin:
         "category"
     )
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if "image" in form.changed_data:
+            from .tasks import make_image_derivatives
+
+            make_image_derivatives.delay(
+                self.object.pk, self.object.image.name
+            )
+        return response
+
 
 class CommentEditMixin:
     model = Comment
@@ -26,13 +59,262 @@ class SuccessUrlMixin:
                        kwargs={"pk": self.kwargs["pk"]})
 
 
+def keyset_page(request, queryset, page_size, keys=("pub_date", "id"),
+                descending=True):
+    """Page of ``queryset`` for the ?after=/?before= cursor of ``request``."""
+    paginator = KeysetPaginator(
+        queryset, page_size, keys=keys, descending=descending
+    )
+    try:
+        return paginator.page(
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+        )
+    except InvalidCursor as error:
+        raise Http404(str(error))
+
+
+class KeysetPaginationMixin:
+    """Paginates a ListView with ?after=/?before= cursors.
+
+    Links with the old ?page=N parameter keep working through the
+    regular offset paginator.
+    """
+
+    keyset_keys = ("pub_date", "id")
+    keyset_descending = True
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        page = keyset_page(
+            self.request,
+            queryset,
+            page_size,
+            keys=self.keyset_keys,
+            descending=self.keyset_descending,
+        )
+        return (
+            page.paginator, page, page.object_list, page.has_other_pages()
+        )
+
+
+class AnonymousPageCacheMixin:
+    """Serves anonymous GET requests from the page cache.
+
+    Cached pages are dropped as soon as any of their tags is bumped by
+    the model signals (see blog.signals).
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_tags(self):
+        return [FEED_TAG]
+
+    def get_page_cache_timeout(self):
+        return self.page_cache_timeout
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request)
+        entry = get_cached_page(key)
+        if entry is not None:
+            return cached_response(entry)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, "render"):
+            response.add_post_render_callback(
+                lambda rendered: set_cached_page(
+                    key,
+                    rendered,
+                    self.get_page_cache_tags(),
+                    self.get_page_cache_timeout(),
+                )
+            )
+        return response
+
+
+class PostPageCacheMixin(AnonymousPageCacheMixin):
+    """Page cache for a single post tagged with everything it shows.
+
+    Views set ``page_comments`` to the comments the page lists.
+    """
+
+    page_comments = ()
+
+    def get_page_cache_tags(self):
+        return post_tags(self.object, self.page_comments)
+
+
+def page_validators(request, tags, *extra):
+    """Return the ETag and Last-Modified of a page built from ``tags``.
+
+    Both come from the version tokens of the tags, so no query runs and
+    nothing is rendered. The ETag also covers the user and the CSRF
+    cookie, which the page shows or embeds, and any ``extra`` state.
+    """
+    versions = get_versions(tags)
+    state = [
+        request.user.pk,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        *extra,
+        *(versions[tag] for tag in tags),
+    ]
+    etag = quote_etag(hashlib.md5(repr(state).encode()).hexdigest())
+    return etag, max(versions.values()) // 10 ** 9
+
+
+def list_validators(request):
+    tags = [FEED_TAG]
+    if request.user.is_authenticated:
+        # Follow buttons and the home timeline show whom the user follows.
+        tags.append(following_tag(request.user.pk))
+    return page_validators(request, tags)
+
+
+def post_validators(request, pk):
+    """Validators of a post page, or None until it has been rendered."""
+    tags = cache.get(
+        versioned_key(POST_VALIDATOR_TAGS_KEY.format(pk), [f"post:{pk}"])
+    )
+    return None if tags is None else page_validators(request, tags)
+
+
+def remember_post_validators(request, post, comments=()):
+    """Store the tags of a rendered post page and return its validators."""
+    tags = post_tags(post, comments)
+    cache.set(
+        versioned_key(POST_VALIDATOR_TAGS_KEY.format(post.pk), tags[:1]),
+        tags,
+        PAGE_CACHE_TIMEOUT,
+    )
+    return page_validators(request, tags)
+
+
+def not_modified(request, validators):
+    """Return a 304 response if the client's copy is still current."""
+    etag, last_modified = validators
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+
+def set_validators(response, validators):
+    etag, last_modified = validators
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def add_validators(response, get_validators):
+    """Set ``get_validators()`` on ``response`` once it is rendered.
+
+    Rendering may warm the caches the validators are built from.
+    """
+    def callback(rendered):
+        validators = get_validators()
+        if validators is not None:
+            set_validators(rendered, validators)
+
+    if getattr(response, "is_rendered", True):
+        callback(response)
+    else:
+        response.add_post_render_callback(callback)
+    return response
+
+
+class ConditionalGetMixin:
+    """Answers GET with 304 Not Modified when the page has not changed.
+
+    get_validators() must not render the page or hit the database; it
+    returns None when the validators are only known once the page is
+    rendered, see get_response_validators().
+    """
+
+    def get_validators(self):
+        return list_validators(self.request)
+
+    def get_response_validators(self):
+        return self.get_validators()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is not None:
+            response = not_modified(request, validators)
+            if response is not None:
+                return set_validators(response, validators)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if validators is None:
+            return add_validators(response, self.get_response_validators)
+        return set_validators(response, validators)
+
+
+class PostConditionalGetMixin(ConditionalGetMixin):
+    """Conditional GET for a post page, validated by its cache tags."""
+
+    def get_validators(self):
+        return post_validators(self.request, self.kwargs["pk"])
+
+    def get_response_validators(self):
+        # Pages served from the page cache never loaded the post.
+        if getattr(self, "object", None) is None:
+            return None
+        return remember_post_validators(
+            self.request, self.object, getattr(self, "page_comments", ())
+        )
+
+
+class ListSubjectMixin:
+    """Fetches the object a list page is about along with the page.
+
+    ``get_subject()`` returns that object (an author or a category) or
+    raises Http404; it goes to the context as ``subject_context_name``.
+    With settings.CONCURRENT_QUERIES the subject and the page are
+    fetched in parallel, and the page is fetched again if
+    page_matches_subject() says it was not the subject's. Otherwise the
+    subject comes first, so a missing one answers 404 without running
+    the posts query, and get_queryset() can filter by ``self.subject``.
+    """
+
+    subject_context_name = None
+    fetch_subject_concurrently = True
+
+    def get_subject(self):
+        raise NotImplementedError
+
+    def page_matches_subject(self):
+        return True
+
+    def get(self, request, *args, **kwargs):
+        self.subject = None
+        if settings.CONCURRENT_QUERIES and self.fetch_subject_concurrently:
+            self.object_list = self.get_queryset()
+            self.subject, context = run_concurrently(
+                self.get_subject, self.get_context_data
+            )
+            if not self.page_matches_subject():
+                self.object_list = self.get_queryset()
+                context = self.get_context_data()
+        else:
+            self.subject = self.get_subject()
+            self.object_list = self.get_queryset()
+            context = self.get_context_data()
+        context[self.subject_context_name] = self.subject
+        return self.render_to_response(context)
+
+
 class VisiblePostsMixin:
     @staticmethod
     def visible_posts_queryset():
         filters = (
             Q(is_published=True)
-            & Q(category__is_published=True)
-            & Q(pub_date__lte=timezone.now())
+            & Q(is_live=True)
+            & Q(category_id__in=published_category_ids())
         )
         return Post.post_list.filter(filters)
 
@@ -44,11 +326,11 @@ class PostDetailsMixin:
             filters = (
                 Q(author=author)
                 | Q(is_published=True)
-                & Q(category__is_published=True)
+                & Q(category_id__in=published_category_ids())
             )
         else:
             filters = (
                 Q(is_published=True)
-                & Q(category__is_published=True)
+                & Q(category_id__in=published_category_ids())
             )
-        return Post.post_list.filter(filters).prefetch_related("comments")
+        return Post.post_list.filter(filters)
@@ -1,5 +1,11 @@
+from datetime import datetime
+
 from django.db import models
+from django.db.models.query import ModelIterable
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from django.urls import reverse
 
@@ -8,19 +14,104 @@ from config import MAX_LENGTH_NAME, MAX_TITLE_LENGTH
 User = get_user_model()
 
 
-class PostManager(models.Manager):
+class LookupModelIterable(ModelIterable):
+    """Attaches categories and locations from the in-process lookup tables.
+
+    Feed queries then need no joins with these small tables.
+    """
+
+    def __iter__(self):
+        from .lookups import categories, locations
+
+        category_rows = categories.rows()
+        location_rows = locations.rows()
+        category_field = Post.category.field
+        location_field = Post.location.field
+        for post in super().__iter__():
+            if post.category_id in category_rows:
+                category_field.set_cached_value(
+                    post, category_rows[post.category_id]
+                )
+            if post.location_id in location_rows:
+                location_field.set_cached_value(
+                    post, location_rows[post.location_id]
+                )
+            yield post
+
+
+class TimestampedQuerySet(models.QuerySet):
+    """Keeps updated_at current in bulk operations, which skip save()."""
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        return super().bulk_update(
+            objs, {*fields, "updated_at"}, batch_size=batch_size
+        )
+
+
+class PostQuerySet(TimestampedQuerySet):
+    """Queryset helpers for blog posts."""
+
+    def update(self, **kwargs):
+        kwargs.setdefault("content_version", F("content_version") + 1)
+        if isinstance(kwargs.get("pub_date"), datetime):
+            kwargs.setdefault("is_live", kwargs["pub_date"] <= timezone.now())
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        fields = {*fields, "content_version"}
+        now = timezone.now()
+        for obj in objs:
+            obj.content_version += 1
+            if "pub_date" in fields:
+                obj.is_live = obj.pub_date <= now
+        if "pub_date" in fields:
+            fields.add("is_live")
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+    def touch(self):
+        """Mark posts as changed, e.g. when one of their comments changed."""
+        return self.update()
+
+    def with_lookups(self):
+        clone = self._chain()
+        clone._iterable_class = LookupModelIterable
+        return clone
+
+    def recount_comments(self):
+        """Rewrite comment_count for posts whose counter has drifted."""
+        actual = Coalesce(
+            Subquery(
+                Comment.objects
+                .filter(post=OuterRef("pk"))
+                .order_by()
+                .values("post")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+        return self.exclude(comment_count=actual).update(
+            comment_count=actual
+        )
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
     """Selects and filters published blog posts"""
 
     def get_queryset(self):
         return (
             super()
             .get_queryset()
-            .select_related(
-                "author",
-                "category",
-                "location",
-            )
-            .order_by("-pub_date")
+            .select_related("author")
+            .with_lookups()
+            .order_by("-pub_date", "-id")
         )
 
 
@@ -36,6 +127,12 @@ class BaseModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    objects = TimestampedQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -124,7 +221,26 @@ class Post(BaseModel):
         "Изображение",
         blank=True,
         upload_to='img/')
-    objects = models.Manager()
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    is_live = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Вышла',
+        help_text='Дата и время публикации наступили; '
+        'отложенные публикации выпускает publish_scheduled_posts.'
+    )
+    content_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия содержимого',
+        help_text='Растёт при каждом изменении публикации '
+        'или её комментариев.'
+    )
+    objects = PostQuerySet.as_manager()
     post_list = PostManager()
 
     class Meta:
@@ -132,10 +248,57 @@ class Post(BaseModel):
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
         default_related_name = "posts"
+        indexes = [
+            models.Index(
+                fields=['is_published', '-pub_date', '-id'],
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True, is_live=True),
+                name='post_live_feed_idx',
+            ),
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_live=False),
+                name='post_pending_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.is_live = self.pub_date <= timezone.now()
+        updating = not self._state.adding and self.pk is not None and not (
+            kwargs.get("force_insert")
+        )
+        if updating:
+            # Comment signals bump the row's version with F() too, so the
+            # value loaded with this instance may be stale by now.
+            self.content_version = F("content_version") + 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                # comment_count is kept by the comment signals as well.
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != "comment_count"
+                ]
+            kwargs["update_fields"] = {
+                *update_fields, "content_version", "updated_at", "is_live"
+            }
+        super().save(*args, **kwargs)
+        if updating:
+            self.refresh_from_db(fields=["content_version"])
+
     def get_absolute_url(self) -> str:
         return reverse("blog:post_detail", kwargs={"pk": self.pk})
 
@@ -160,12 +323,68 @@ class Comment(models.Model):
         verbose_name="Дата",
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Изменено",
+        auto_now=True,
+    )
+
+    objects = TimestampedQuerySet.as_manager()
 
     class Meta:
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("created_at",)
         default_related_name = "comments"
+        indexes = [
+            models.Index(
+                fields=["post", "created_at", "id"],
+                name="comment_post_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class Follow(models.Model):
+    """Subscription of a user to the posts of an author."""
+
+    follower = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following",
+        verbose_name="Подписчик",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="followers",
+        verbose_name="Автор",
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Добавлено",
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = "подписка"
+        verbose_name_plural = "Подписки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["follower", "author"],
+                name="unique_follow",
+            ),
+            models.CheckConstraint(
+                check=~models.Q(follower=models.F("author")),
+                name="no_self_follow",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["author", "follower"],
+                name="follow_author_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.follower} → {self.author}"
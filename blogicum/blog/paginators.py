@@ -0,0 +1,243 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage(Sequence):
+    """Page of objects fetched by seeking past a cursor.
+
+    ``bounds`` are the key values the page starts and ends at when they
+    are not those of its first and last object.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous,
+                 bounds=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._bounds = bounds
+
+    def __repr__(self):
+        return '<KeysetPage of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        if self._bounds is not None:
+            return self.paginator.encode_values(self._bounds[1])
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        if self._bounds is not None:
+            return self.paginator.encode_values(self._bounds[0])
+        if not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    """Paginates a queryset by the values of its ordering keys.
+
+    Every page is fetched with ``WHERE keys < cursor ORDER BY keys
+    LIMIT per_page + 1``, so its cost does not depend on how deep the
+    page is. The total ``count`` is only queried when something reads it.
+    """
+
+    keyset = True
+
+    def __init__(self, queryset, per_page, keys=('pub_date', 'id'),
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = tuple(keys)
+        self.descending = descending
+
+    @cached_property
+    def count(self):
+        return self.queryset.count()
+
+    def encode_cursor(self, obj):
+        values = [
+            self.queryset.model._meta.get_field(key).value_to_string(obj)
+            for key in self.keys
+        ]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def encode_values(self, values):
+        """Cursor of an object whose keys have the given ``values``."""
+        return self.encode_cursor(
+            self.queryset.model(**dict(zip(self.keys, values)))
+        )
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor('Некорректный курсор страницы.')
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise InvalidCursor('Некорректный курсор страницы.')
+        try:
+            return [
+                self.queryset.model._meta.get_field(key).to_python(value)
+                for key, value in zip(self.keys, values)
+            ]
+        except Exception:
+            raise InvalidCursor('Некорректный курсор страницы.')
+
+    def page(self, after=None, before=None):
+        if before:
+            return self._page_before(self.decode_cursor(before))
+        queryset = self.queryset.order_by(*self._ordering())
+        if after:
+            queryset = queryset.filter(
+                self.seek_filter(self.decode_cursor(after), self.descending)
+            )
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page],
+            self,
+            has_next=len(rows) > self.per_page,
+            has_previous=bool(after),
+        )
+
+    def _page_before(self, values):
+        queryset = (
+            self.queryset
+            .filter(self.seek_filter(values, not self.descending))
+            .order_by(*self._ordering(reverse=True))
+        )
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page][::-1],
+            self,
+            has_next=True,
+            has_previous=len(rows) > self.per_page,
+        )
+
+    def _ordering(self, reverse=False):
+        prefix = '-' if self.descending != reverse else ''
+        return [prefix + key for key in self.keys]
+
+    def seek_filter(self, values, descending):
+        """Build ``(k1, k2, ...) < (v1, v2, ...)`` (or ``>``) as a Q.
+
+        The leading ``k1 <= v1`` term is redundant but lets the planner
+        use the index range scan on the first key.
+        """
+        strict = 'lt' if descending else 'gt'
+        loose = 'lte' if descending else 'gte'
+        condition = Q()
+        for position, (key, value) in enumerate(zip(self.keys, values)):
+            equal = {k: v for k, v in zip(self.keys[:position], values)}
+            condition |= Q(**equal, **{f'{key}__{strict}': value})
+        return Q(**{f'{self.keys[0]}__{loose}': values[0]}) & condition
+
+
+class TimelinePaginator(KeysetPaginator):
+    """Keyset pagination over a precomputed list of ordering keys.
+
+    ``entries`` holds the key tuples of every object in page order, so a
+    page is found by binary search and only its objects are loaded from
+    ``queryset``. The last key must be the primary key. Cursors are the
+    same as KeysetPaginator's.
+    """
+
+    def __init__(self, entries, queryset, per_page, keys=('pub_date', 'id'),
+                 descending=True):
+        super().__init__(queryset, per_page, keys=keys, descending=descending)
+        self.entries = entries
+
+    @property
+    def count(self):
+        return len(self.entries)
+
+    def _first_past(self, values, inclusive=False):
+        """Index of the first entry lying past ``values`` in page order."""
+        values = tuple(values)
+
+        def past(entry):
+            if inclusive and tuple(entry) == values:
+                return True
+            if self.descending:
+                return tuple(entry) < values
+            return tuple(entry) > values
+
+        low, high = 0, len(self.entries)
+        while low < high:
+            middle = (low + high) // 2
+            if past(self.entries[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def page(self, after=None, before=None):
+        # Entries whose objects the queryset no longer returns are
+        # skipped and the page is filled from the entries next to it.
+        # Its cursors are the keys of the first and last entry read, so
+        # the neighbouring pages neither repeat nor skip anything.
+        objects = []
+        if before:
+            end = self._first_past(self.decode_cursor(before), inclusive=True)
+            start = end
+            while len(objects) < self.per_page and start > 0:
+                stop = start
+                start = max(start - self.per_page + len(objects), 0)
+                objects[:0] = self._load(self.entries[start:stop])
+            has_next, has_previous = True, start > 0
+        else:
+            start = self._first_past(self.decode_cursor(after)) if after else 0
+            end = start
+            while len(objects) < self.per_page and end < len(self.entries):
+                stop = end
+                end = min(end + self.per_page - len(objects),
+                          len(self.entries))
+                objects += self._load(self.entries[stop:end])
+            has_next, has_previous = end < len(self.entries), bool(after)
+        bounds = None
+        if start < end:
+            bounds = (self.entries[start], self.entries[end - 1])
+        return KeysetPage(
+            objects,
+            self,
+            has_next=has_next,
+            has_previous=has_previous,
+            bounds=bounds,
+        )
+
+    def _load(self, entries):
+        """Objects of ``entries`` in order, leaving out missing ones."""
+        ids = [entry[-1] for entry in entries]
+        objects = self.queryset.order_by().in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
@@ -0,0 +1,151 @@
+"""Deferred posts going live.
+
+Post.is_live records whether a post's pub_date has come, so feed queries
+filter on a stored flag instead of comparing pub_date with the clock.
+save() sets the flag; posts that reach their pub_date later are switched
+by publish_due_posts(), which also invalidates every cache showing them
+and fans them out to the home timelines of their authors' followers.
+It runs outside the request cycle: saving a deferred post queues the
+publish_scheduled_posts task for its pub_date, and the command of the
+same name publishes whatever is due.
+
+Requests never write. ScheduledPostsMiddleware only compares the cached
+date of the next deferred post with the clock; once it has passed, it
+drops this process's caches of the posts published since then, as the
+job may have run in a process with a cache of its own.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+
+from blogicum.routers import pin_to_primary
+from config import PUBLISH_BATCH_SIZE, PUBLISH_CHECK_INTERVAL
+
+from .cache import (
+    FEED_TAG,
+    POSTS_TAG,
+    invalidate,
+    post_feed_tags,
+    versioned_key,
+)
+from .models import Post
+from .tasks import fan_out_posts
+
+NEXT_PUB_DATE_KEY = "blog:next-pub-date"
+PUBLISH_CHECK_KEY = "blog:publish-check"
+
+
+def cached_next_pub_date():
+    """Cache entry written by refresh_next_pub_date(), or None."""
+    return cache.get(versioned_key(NEXT_PUB_DATE_KEY, [POSTS_TAG]))
+
+
+def refresh_next_pub_date():
+    """Look up and cache the pub_date of the next deferred post."""
+    with pin_to_primary():
+        pub_date = (
+            Post.objects.filter(is_live=False)
+            .order_by("pub_date")
+            .values_list("pub_date", flat=True)
+            .first()
+        )
+    entry = {"pub_date": pub_date}
+    cache.set(versioned_key(NEXT_PUB_DATE_KEY, [POSTS_TAG]), entry, None)
+    return entry
+
+
+def next_pub_date():
+    entry = cached_next_pub_date() or refresh_next_pub_date()
+    return entry["pub_date"]
+
+
+def published_tags(rows):
+    """Tags of caches showing posts given as (pk, category_id, author_id)."""
+    tags = {FEED_TAG}
+    for pk, category_id, author_id in rows:
+        tags.add(f"post:{pk}")
+        tags.update(post_feed_tags(category_id, author_id))
+    return tags
+
+
+def publish_due_posts(now=None):
+    """Make posts whose pub_date has come live; return how many."""
+    now = now or timezone.now()
+    published = 0
+    # Replicas may still show the posts this loop has just updated.
+    with pin_to_primary():
+        while True:
+            due = list(
+                Post.objects.filter(is_live=False, pub_date__lte=now)
+                .order_by("pub_date")
+                .values_list("pk", "category_id", "author_id")[
+                    :PUBLISH_BATCH_SIZE
+                ]
+            )
+            if not due:
+                break
+            updated = Post.objects.filter(
+                pk__in=[pk for pk, _, _ in due], is_live=False
+            ).update(is_live=True)
+            if not updated:
+                break
+            invalidate(*published_tags(due))
+            fan_out_posts.delay([pk for pk, _, _ in due])
+            published += updated
+        refresh_next_pub_date()
+    return published
+
+
+def refresh_published_caches():
+    """Drop cached pages of posts published since the cached next date.
+
+    Only reads: nothing but the cache is looked at until that date has
+    passed, and then one request per PUBLISH_CHECK_INTERVAL queries the
+    posts that went live. Return how many there were.
+    """
+    entry = cached_next_pub_date()
+    now = timezone.now()
+    if entry is not None and (
+        entry["pub_date"] is None or entry["pub_date"] > now
+    ):
+        return 0
+    if not cache.add(PUBLISH_CHECK_KEY, True, PUBLISH_CHECK_INTERVAL):
+        return 0
+    with pin_to_primary():
+        live = []
+        if entry is not None:
+            live = list(
+                Post.objects.filter(
+                    is_live=True,
+                    pub_date__gte=entry["pub_date"],
+                    pub_date__lte=now,
+                ).values_list("pk", "category_id", "author_id")
+            )
+        if live:
+            invalidate(*published_tags(live))
+        refresh_next_pub_date()
+    return len(live)
+
+
+class ScheduledPostsMiddleware:
+    """Runs refresh_published_caches() before every request is served."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        refresh_published_caches()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        await sync_to_async(refresh_published_caches)()
+        return await self.get_response(request)
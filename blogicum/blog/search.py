@@ -0,0 +1,317 @@
+"""Full-text search over posts and comments.
+
+Documents live in the ``blog_search`` table created by migration 0010:
+an FTS5 virtual table on SQLite and a ``tsvector`` table with a GIN index
+on PostgreSQL. Each post and each comment is one row whose id encodes the
+object, so model signals can update the index row by row.
+"""
+import re
+
+from django.db import connection
+
+from config import SEARCH_MAX_RESULTS
+
+TABLE = 'blog_search'
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_RE = re.compile(r'[а-яё]')
+
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    (
+        'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+        'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+        'ая', 'яя', 'ою', 'ею',
+    ),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    (
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+        'ют', 'ны', 'ть', 'ешь', 'нно',
+    ),
+    (
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+        'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+        'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    ),
+)
+NOUN = (
+    (),
+    (
+        'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+        'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+        'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+        'ья', 'я',
+    ),
+)
+DERIVATIONAL = ((), ('ост', 'ость'))
+SUPERLATIVE = ((), ('ейш', 'ейше'))
+
+
+def _region_after_vowel_consonant(word, start):
+    for position in range(start + 1, len(word)):
+        if word[position] not in VOWELS and word[position - 1] in VOWELS:
+            return position + 1
+    return len(word)
+
+
+def _strip(word, region, groups):
+    """Remove the longest suffix of ``groups`` lying inside ``region``.
+
+    Suffixes of the first group must follow 'а' or 'я'. As in Snowball,
+    only the longest match is tried. Returns None when nothing matched.
+    """
+    best = None
+    for group, suffixes in enumerate(groups):
+        for suffix in suffixes:
+            if word.endswith(suffix) and len(word) - len(suffix) >= region:
+                if best is None or len(suffix) > len(best[1]):
+                    best = (group, suffix)
+    if best is None:
+        return None
+    group, suffix = best
+    stem = word[:-len(suffix)]
+    if group == 0 and not (len(stem) > region and stem[-1] in 'ая'):
+        return None
+    return stem
+
+
+def stem(word):
+    """Snowball (Porter) stemmer for Russian words."""
+    word = word.lower().replace('ё', 'е')
+    rv = next(
+        (i + 1 for i, letter in enumerate(word) if letter in VOWELS),
+        len(word),
+    )
+    r1 = _region_after_vowel_consonant(word, 0)
+    r2 = _region_after_vowel_consonant(word, r1)
+
+    stripped = _strip(word, rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _strip(word, rv, REFLEXIVE) or word
+        adjective = _strip(word, rv, ADJECTIVE)
+        if adjective is not None:
+            stripped = _strip(adjective, rv, PARTICIPLE) or adjective
+        else:
+            stripped = _strip(word, rv, VERB) or _strip(word, rv, NOUN)
+    word = stripped if stripped is not None else word
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _strip(word, r2, DERIVATIONAL) or word
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _strip(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        if word.endswith('нн'):
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lower-case words of ``text``, with Russian words stemmed."""
+    tokens = []
+    for word in WORD_RE.findall(text.lower()):
+        tokens.append(stem(word) if CYRILLIC_RE.search(word) else word)
+    return tokens
+
+
+def post_row_id(post_id):
+    return post_id * 2
+
+
+def comment_row_id(comment_id):
+    return comment_id * 2 + 1
+
+
+class SearchBackend:
+    """Keeps the search table in sync and ranks posts for a query."""
+
+    def index(self, row_id, post_id, title, body):
+        raise NotImplementedError
+
+    def remove(self, row_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def ranked_post_ids(self, query, limit):
+        raise NotImplementedError
+
+
+class SqliteSearchBackend(SearchBackend):
+    """FTS5 table with pre-stemmed text, ranked by bm25()."""
+
+    def index(self, row_id, post_id, title, body):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [row_id])
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, title, body, post_id) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    row_id,
+                    ' '.join(tokenize(title)),
+                    ' '.join(tokenize(body)),
+                    post_id,
+                ],
+            )
+
+    def remove(self, row_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [row_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+
+    def ranked_post_ids(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT post_id, MIN(score) FROM ('
+                f'  SELECT post_id, bm25({TABLE}, 10.0, 1.0) AS score'
+                f'  FROM {TABLE} WHERE {TABLE} MATCH %s'
+                '  ORDER BY score LIMIT %s'
+                ') GROUP BY post_id ORDER BY 2',
+                [match, limit * 4],
+            )
+            return [row[0] for row in cursor.fetchall()][:limit]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector column with the 'russian' configuration and a GIN index."""
+
+    def index(self, row_id, post_id, title, body):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {TABLE} (id, post_id, document) VALUES ('
+                "  %s, %s,"
+                "  setweight(to_tsvector('russian', %s), 'A')"
+                "  || setweight(to_tsvector('russian', %s), 'B')"
+                ') ON CONFLICT (id) DO UPDATE SET '
+                'post_id = EXCLUDED.post_id, document = EXCLUDED.document',
+                [row_id, post_id, title, body],
+            )
+
+    def remove(self, row_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE id = %s', [row_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {TABLE}')
+
+    def ranked_post_ids(self, query, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT post_id, MAX(ts_rank(document, query)) AS score '
+                f"FROM {TABLE}, plainto_tsquery('russian', %s) query "
+                'WHERE document @@ query '
+                'GROUP BY post_id ORDER BY score DESC LIMIT %s',
+                [query, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Unindexed fallback for databases without full-text support."""
+
+    def index(self, row_id, post_id, title, body):
+        pass
+
+    def remove(self, row_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def ranked_post_ids(self, query, limit):
+        from django.db.models import Q
+
+        from .models import Post
+
+        return list(
+            Post.objects.filter(
+                Q(title__icontains=query)
+                | Q(text__icontains=query)
+                | Q(comments__text__icontains=query)
+            )
+            .order_by('-pub_date')
+            .values_list('pk', flat=True)
+            .distinct()[:limit]
+        )
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, DatabaseSearchBackend)()
+
+
+def index_post(post):
+    get_backend().index(post_row_id(post.pk), post.pk, post.title, post.text)
+
+
+def index_comment(comment):
+    get_backend().index(
+        comment_row_id(comment.pk), comment.post_id, '', comment.text
+    )
+
+
+def remove_post(post_id):
+    get_backend().remove(post_row_id(post_id))
+
+
+def remove_comment(comment_id):
+    get_backend().remove(comment_row_id(comment_id))
+
+
+class RankedPosts:
+    """Lazy sequence of posts in relevance order.
+
+    Only the slice a paginator asks for is loaded from the database.
+    """
+
+    def __init__(self, post_ids, queryset):
+        self.post_ids = post_ids
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return self[index:index + 1][0]
+        ids = self.post_ids[index]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query, queryset):
+    """Rank ``queryset`` posts matching ``query``, best first."""
+    ranked = get_backend().ranked_post_ids(query, SEARCH_MAX_RESULTS)
+    visible = set(
+        queryset.filter(pk__in=ranked).values_list('pk', flat=True)
+    )
+    return RankedPosts([pk for pk in ranked if pk in visible], queryset)
@@ -0,0 +1,202 @@
+import threading
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .cache import FEED_TAG, following_tag, invalidate, post_feed_tags
+from .lookups import CATEGORIES_TAG, LOCATIONS_TAG
+from .publishing import refresh_next_pub_date
+from .models import Category, Comment, Follow, Location, Post, User
+from .search import index_comment, index_post, remove_comment, remove_post
+from .tasks import (
+    fan_out_posts,
+    publish_scheduled_posts,
+    remove_image_derivatives,
+)
+
+_deleting = threading.local()
+
+
+def _deleting_posts():
+    if not hasattr(_deleting, "posts"):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+def change_comment_count(post_id, delta):
+    """Shift the stored comment counter of a post by ``delta``.
+
+    Like any queryset update this also bumps the post's content_version.
+    """
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F("comment_count") + delta)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._previous_post_id = (
+        Comment.objects.filter(pk=instance.pk)
+        .values_list("post_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        change_comment_count(instance.post_id, 1)
+        return
+    previous_post_id = getattr(instance, "_previous_post_id", None)
+    if previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+    else:
+        Post.objects.filter(pk=instance.post_id).touch()
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts().discard(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    # Comments removed together with their post need no counter update.
+    if instance.post_id not in _deleting_posts():
+        change_comment_count(instance.post_id, -1)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    previous = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("category_id", "author_id", "image")
+        .first()
+    )
+    if previous is None:
+        instance._previous_feed_tags = []
+        return
+    category_id, author_id, image = previous
+    instance._previous_feed_tags = post_feed_tags(category_id, author_id)
+    instance._previous_image = image
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    invalidate(
+        f"post:{instance.pk}",
+        FEED_TAG,
+        *post_feed_tags(instance.category_id, instance.author_id),
+        *getattr(instance, "_previous_feed_tags", []),
+    )
+    # The post may be deferred, or no longer be. The second refresh
+    # runs after invalidate() bumps the tags again.
+    refresh_next_pub_date()
+    transaction.on_commit(refresh_next_pub_date)
+
+
+@receiver(post_save, sender=Post)
+def schedule_deferred_post(sender, instance, raw=False, **kwargs):
+    if raw or instance.is_live or not instance.is_published:
+        return
+    publish_scheduled_posts.delay_until(instance.pub_date)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_saved_post(sender, instance, raw=False, **kwargs):
+    if raw or not (instance.is_published and instance.is_live):
+        return
+    fan_out_posts.delay([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def remove_replaced_image_derivatives(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_image", "")
+    if not raw and previous and previous != instance.image.name:
+        remove_image_derivatives.delay(previous)
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_image_derivatives(sender, instance, **kwargs):
+    if instance.image:
+        remove_image_derivatives.delay(instance.image.name)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_following(sender, instance, **kwargs):
+    invalidate(following_tag(instance.follower_id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post(sender, instance, **kwargs):
+    tags = [f"post:{instance.post_id}", FEED_TAG]
+    previous_post_id = getattr(instance, "_previous_post_id", None)
+    if previous_post_id and previous_post_id != instance.post_id:
+        tags.append(f"post:{previous_post_id}")
+    invalidate(*tags)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    invalidate(f"category:{instance.pk}", CATEGORIES_TAG, FEED_TAG)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    invalidate(f"location:{instance.pk}", LOCATIONS_TAG, FEED_TAG)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached page shows.
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    invalidate(f"user:{instance.pk}", FEED_TAG)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    remove_comment(instance.pk)
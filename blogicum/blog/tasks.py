@@ -0,0 +1,32 @@
+"""Background tasks of the blog, queued with ``task.delay(...)``."""
+from jobs.queue import task
+
+from .cache import FEED_TAG, bump_versions
+from .images import delete_derivatives, generate_derivatives
+from .timelines import fan_out_post
+
+
+@task()
+def make_image_derivatives(post_id, name):
+    generate_derivatives(name)
+    # Cached cards and pages were rendered without the new srcset.
+    bump_versions(f'post:{post_id}', FEED_TAG)
+
+
+@task()
+def remove_image_derivatives(name):
+    delete_derivatives(name)
+
+
+@task(priority=5)
+def publish_scheduled_posts():
+    # blog.publishing queues fan_out_posts from this module.
+    from .publishing import publish_due_posts
+
+    publish_due_posts()
+
+
+@task(priority=10)
+def fan_out_posts(post_ids):
+    for post_id in post_ids:
+        fan_out_post(post_id)
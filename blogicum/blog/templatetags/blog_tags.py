@@ -0,0 +1,48 @@
+from django import template
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from blog.cache import post_tags, versioned_key
+from blog.images import available_derivatives
+from config import IMAGE_DERIVATIVE_WIDTHS, POST_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Render includes/post_card.html through the fragment cache."""
+    key = versioned_key(f"blog:post_card:{post.pk}", post_tags(post))
+    html = cache.get(key)
+    if html is None:
+        card = context.template.engine.get_template("includes/post_card.html")
+        with context.push(post=post):
+            html = card.render(context)
+        cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+IMAGE_SIZES = {
+    "card": "(max-width: 40rem) 100vw, 40rem",
+    "detail": "(max-width: 40rem) 100vw, 40rem",
+}
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(image, kind="card"):
+    """Responsive <picture> for a post image with WebP and sized copies."""
+    derivatives = available_derivatives(image.name)
+    jpeg = derivatives["jpeg"]
+    src = image.url
+    for url, width in jpeg:
+        if width == IMAGE_DERIVATIVE_WIDTHS[kind]:
+            src = url
+    return {
+        "image": image,
+        "src": src,
+        "sizes": IMAGE_SIZES[kind],
+        "jpeg_srcset": ", ".join(f"{url} {width}w" for url, width in jpeg),
+        "webp_srcset": ", ".join(
+            f"{url} {width}w" for url, width in derivatives["webp"]
+        ),
+    }
@@ -0,0 +1,264 @@
+"""Precomputed timelines: per author for profiles, per user for /feed/.
+
+A timeline is the ordered list of ``(pub_date, id)`` pairs of an
+author's posts, kept in the cache. The owner of a profile sees all their
+posts, other visitors only the visible ones. A timeline is tagged with
+``posts:author:<id>``, which post saves, deletes and publish_due_posts()
+bump, so it is rebuilt with a single index scan after each change and a
+profile page costs one primary key lookup however many posts there are.
+
+The home timeline of a user merges the posts of the authors they follow.
+It is built by fan-out on write: fan_out_post() pushes every post that
+goes live onto the capped home timelines of its author's followers, so
+reading one is a single cache lookup. Authors with more than
+CELEBRITY_FOLLOWERS followers are not fanned out, which would cost a
+write per follower; their author timelines are merged in on read
+instead. Home timelines are tagged with ``follows:<user id>``, so
+following or unfollowing someone rebuilds the timeline from the
+database, as does a missing one: fan-out only updates cached timelines.
+"""
+import heapq
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from config import (
+    CELEBRITY_FOLLOWERS,
+    FAN_OUT_BATCH_SIZE,
+    FOLLOWING_CACHE_TIMEOUT,
+    HOME_TIMELINE_LENGTH,
+    TIMELINE_CACHE_TIMEOUT,
+)
+
+from .cache import following_tag, get_versions, versioned_key
+from .lookups import CATEGORIES_TAG
+from .mixins import VisiblePostsMixin
+from .models import Follow, Post, User
+from .paginators import InvalidCursor, TimelinePaginator
+
+TIMELINE_KEY = "blog:timeline:author:{}:{}"
+HOME_KEY = "blog:timeline:home:{}"
+FOLLOWING_KEY = "blog:following:{}"
+AUTHOR_ID_KEY = "blog:author-id:{}"
+
+
+def author_posts(author_id, owner=False):
+    if owner:
+        return Post.post_list.filter(author_id=author_id)
+    return VisiblePostsMixin.visible_posts_queryset().filter(
+        author_id=author_id
+    )
+
+
+def author_timeline(author_id, owner=False):
+    """Return ``(pub_date, id)`` of the author's posts, newest first."""
+    key = versioned_key(
+        TIMELINE_KEY.format(author_id, "owner" if owner else "public"),
+        [f"posts:author:{author_id}", CATEGORIES_TAG],
+    )
+    entries = cache.get(key)
+    if entries is None:
+        entries = list(
+            author_posts(author_id, owner)
+            .order_by("-pub_date", "-id")
+            .values_list("pub_date", "id")
+        )
+        cache.set(key, entries, TIMELINE_CACHE_TIMEOUT)
+    return entries
+
+
+def profile_author(username, viewer):
+    """Author of a profile page, with ``is_followed`` by the viewer.
+
+    The flag comes with the author in the same query.
+    """
+    authors = User.objects.all()
+    if viewer.is_authenticated:
+        authors = authors.annotate(
+            is_followed=Exists(
+                Follow.objects.filter(
+                    follower_id=viewer.pk, author_id=OuterRef("pk")
+                )
+            )
+        )
+    return get_object_or_404(authors, username=username)
+
+
+def cached_author_id(username):
+    """Id a profile view last found for ``username``, or None.
+
+    With it a profile page can be fetched along with its author. The
+    id may be out of date after a rename; callers compare it with the
+    author they get.
+    """
+    return cache.get(AUTHOR_ID_KEY.format(username))
+
+
+def remember_author_id(author):
+    cache.set(
+        AUTHOR_ID_KEY.format(author.username), author.pk,
+        TIMELINE_CACHE_TIMEOUT,
+    )
+
+
+def home_tags(user_id):
+    return [following_tag(user_id), CATEGORIES_TAG]
+
+
+def followed_authors(user_id):
+    """Return the ids of the authors the user follows and of celebrities.
+
+    Celebrities are the followed authors with more than
+    CELEBRITY_FOLLOWERS followers. The answer is cached until the user
+    follows or unfollows someone, but at most FOLLOWING_CACHE_TIMEOUT,
+    as followers of others make authors celebrities too.
+    """
+    key = versioned_key(
+        FOLLOWING_KEY.format(user_id), [following_tag(user_id)]
+    )
+    entry = cache.get(key)
+    if entry is None:
+        followers = (
+            Follow.objects.filter(author_id=OuterRef("author_id"))
+            .order_by()
+            .values("author_id")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        rows = (
+            Follow.objects.filter(follower_id=user_id)
+            .annotate(followers=Subquery(followers))
+            .values_list("author_id", "followers")
+        )
+        entry = {"authors": [], "celebrities": []}
+        for author_id, count in rows:
+            entry["authors"].append(author_id)
+            if count > CELEBRITY_FOLLOWERS:
+                entry["celebrities"].append(author_id)
+        cache.set(key, entry, FOLLOWING_CACHE_TIMEOUT)
+    return entry["authors"], entry["celebrities"]
+
+
+def home_posts(authors):
+    return VisiblePostsMixin.visible_posts_queryset().filter(
+        author_id__in=authors
+    )
+
+
+def home_timeline(user_id):
+    """Return ``(pub_date, id)`` of the posts in the user's home feed."""
+    authors, celebrities = followed_authors(user_id)
+    key = versioned_key(HOME_KEY.format(user_id), home_tags(user_id))
+    entries = cache.get(key)
+    if entries is None:
+        fanned_out = set(authors).difference(celebrities)
+        entries = []
+        if fanned_out:
+            entries = list(
+                home_posts(fanned_out)
+                .order_by("-pub_date", "-id")
+                .values_list("pub_date", "id")[:HOME_TIMELINE_LENGTH]
+            )
+        cache.set(key, entries, TIMELINE_CACHE_TIMEOUT)
+    if not celebrities:
+        return entries
+    # An author who just became a celebrity may still be in both.
+    merged = heapq.merge(
+        entries,
+        *(author_timeline(author_id) for author_id in celebrities),
+        reverse=True,
+    )
+    timeline, seen = [], set()
+    for entry in merged:
+        if entry[1] in seen:
+            continue
+        seen.add(entry[1])
+        timeline.append(entry)
+        if len(timeline) == HOME_TIMELINE_LENGTH:
+            break
+    return timeline
+
+
+def push_entry(entries, entry):
+    """Insert ``entry`` into a capped timeline, replacing the same post."""
+    entries = [item for item in entries if item[1] != entry[1]]
+    entries.append(entry)
+    entries.sort(reverse=True)
+    return entries[:HOME_TIMELINE_LENGTH]
+
+
+def fan_out_post(post_id):
+    """Push a visible post onto the cached home timelines of followers.
+
+    Return how many timelines were updated. Posts of celebrities and
+    posts that are not visible are left alone.
+    """
+    row = (
+        VisiblePostsMixin.visible_posts_queryset()
+        .filter(pk=post_id)
+        .values_list("pub_date", "author_id")
+        .first()
+    )
+    if row is None:
+        return 0
+    pub_date, author_id = row
+    followers = list(
+        Follow.objects.filter(author_id=author_id)
+        .values_list("follower_id", flat=True)[:CELEBRITY_FOLLOWERS + 1]
+    )
+    if len(followers) > CELEBRITY_FOLLOWERS:
+        return 0
+    updated = 0
+    for start in range(0, len(followers), FAN_OUT_BATCH_SIZE):
+        batch = followers[start:start + FAN_OUT_BATCH_SIZE]
+        versions = get_versions(
+            [CATEGORIES_TAG, *(following_tag(user_id) for user_id in batch)]
+        )
+        keys = [
+            versioned_key(
+                HOME_KEY.format(user_id), home_tags(user_id), versions
+            )
+            for user_id in batch
+        ]
+        stored = cache.get_many(keys)
+        cache.set_many(
+            {
+                key: push_entry(entries, (pub_date, post_id))
+                for key, entries in stored.items()
+            },
+            TIMELINE_CACHE_TIMEOUT,
+        )
+        updated += len(stored)
+    return updated
+
+
+def entries_page(request, entries, queryset, page_size):
+    """Page of a precomputed timeline for the ?after=/?before= cursor."""
+    paginator = TimelinePaginator(entries, queryset, page_size)
+    try:
+        return paginator.page(
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+        )
+    except InvalidCursor as error:
+        raise Http404(str(error))
+
+
+def timeline_page(request, author_id, owner, page_size):
+    """Page of an author's timeline for the ?after=/?before= cursor."""
+    return entries_page(
+        request,
+        author_timeline(author_id, owner),
+        author_posts(author_id, owner),
+        page_size,
+    )
+
+
+def home_page(request, user_id, page_size):
+    """Page of the user's home timeline for the ?after=/?before= cursor."""
+    authors, _ = followed_authors(user_id)
+    return entries_page(
+        request, home_timeline(user_id), home_posts(authors), page_size
+    )
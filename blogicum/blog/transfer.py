@@ -0,0 +1,360 @@
+"""Streaming export and import of blog data.
+
+Every model goes to its own file in a directory: ``blog.post.ndjson``
+(one JSON object per line) or ``blog.post.csv``. Rows are read with
+``iterator()`` and written batch by batch, so memory use does not depend
+on the size of the data. All models are read in one transaction, so a
+run exports a consistent snapshot. After every batch the position
+reached is saved to a checkpoint file, and an interrupted run continues
+from there. Uploaded images are copied to a ``media`` subdirectory.
+
+Import is an upsert by primary key: new rows are inserted in batches
+exactly as exported and existing ones are changed with bulk_update.
+"""
+import csv
+import io
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from blogicum.routers import pin_to_primary
+
+from .cache import FEED_TAG, POSTS_TAG, bump_versions
+from .lookups import CATEGORIES_TAG, LOCATIONS_TAG
+from .models import Category, Comment, Location, Post, User
+from .publishing import publish_due_posts
+
+FORMATS = ('ndjson', 'csv')
+# In dependency order: rows only reference rows of earlier models.
+MODELS = (User, Category, Location, Post, Comment)
+MEDIA_DIR = 'media'
+EXPORT_CHECKPOINT = 'export.checkpoint.json'
+IMPORT_CHECKPOINT = 'import.checkpoint.json'
+
+
+class Checkpoint:
+    """Progress of a transfer per model, kept in a small JSON file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.state = {}
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text(encoding='utf-8'))
+
+    def get(self, model):
+        return self.state.get(model._meta.label_lower, {})
+
+    def save(self, model, **state):
+        self.state[model._meta.label_lower] = state
+        temporary = self.path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.state), encoding='utf-8')
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        self.state = {}
+        if self.path.exists():
+            self.path.unlink()
+
+
+def data_path(directory, model, data_format):
+    return Path(directory) / f'{model._meta.label_lower}.{data_format}'
+
+
+def file_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_rows(rows, columns, data_format):
+    if data_format == 'ndjson':
+        return ''.join(
+            json.dumps(
+                {column: encode_value(value)
+                 for column, value in zip(columns, row)},
+                ensure_ascii=False,
+            ) + '\n'
+            for row in rows
+        ).encode()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            '' if value is None else encode_value(value) for value in row
+        )
+    return buffer.getvalue().encode()
+
+
+def copy_media(name, target_dir, storage=default_storage):
+    target = Path(target_dir) / name
+    if not name or target.exists() or not storage.exists(name):
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with storage.open(name) as source, open(target, 'wb') as destination:
+        shutil.copyfileobj(source, destination)
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_model(model, directory, data_format, checkpoint,
+                 batch_size=2000, media=True, progress=None):
+    """Write the rows of ``model`` newer than the checkpoint to its file."""
+    state = checkpoint.get(model)
+    if state.get('done'):
+        return 0
+    columns = [field.attname for field in model._meta.concrete_fields]
+    media_columns = [
+        columns.index(field.attname) for field in file_fields(model)
+    ] if media else []
+    exported = state.get('rows', 0)
+    rows = (
+        model._base_manager.filter(pk__gt=state.get('pk', 0))
+        .order_by('pk').values_list(*columns)
+        .iterator(chunk_size=batch_size)
+    )
+    offset = state.get('offset', 0)
+    path = data_path(directory, model, data_format)
+    with open(path, 'r+b' if offset else 'wb') as output:
+        # Drop whatever was written after the last saved checkpoint.
+        output.seek(offset)
+        output.truncate()
+        if data_format == 'csv' and offset == 0:
+            output.write(encode_rows([columns], columns, 'csv'))
+        for batch in batched(rows, batch_size):
+            output.write(encode_rows(batch, columns, data_format))
+            output.flush()
+            for row in batch:
+                for position in media_columns:
+                    copy_media(row[position], Path(directory) / MEDIA_DIR)
+            exported += len(batch)
+            checkpoint.save(
+                model, pk=batch[-1][0], offset=output.tell(), rows=exported
+            )
+            if progress:
+                progress(model, exported)
+    checkpoint.save(model, done=True, rows=exported)
+    return exported
+
+
+@contextmanager
+def snapshot():
+    """Read everything inside the block from one snapshot of the primary.
+
+    PostgreSQL reads committed data per statement unless asked for
+    REPEATABLE READ; SQLite and MySQL (InnoDB) keep a snapshot per
+    transaction anyway.
+    """
+    with pin_to_primary():
+        outermost = not connection.in_atomic_block
+        with transaction.atomic():
+            if outermost and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ'
+                    )
+            yield
+
+
+def export_data(directory, data_format='ndjson', batch_size=2000,
+                media=True, restart=False, progress=None):
+    """Export every model in MODELS into ``directory``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    checkpoint = Checkpoint(directory / EXPORT_CHECKPOINT)
+    if restart:
+        checkpoint.clear()
+        for model in MODELS:
+            data_path(directory, model, data_format).unlink(missing_ok=True)
+    with snapshot():
+        totals = {
+            model: export_model(
+                model, directory, data_format, checkpoint,
+                batch_size=batch_size, media=media, progress=progress,
+            )
+            for model in MODELS
+        }
+    checkpoint.clear()
+    return totals
+
+
+def read_records(path, data_format, offset):
+    """Yield ``(record, end_offset)`` pairs from ``offset`` onwards."""
+    with open(path, 'rb') as source:
+        header = None
+        if data_format == 'csv':
+            header = next(csv.reader([source.readline().decode()]))
+            offset = max(offset, source.tell())
+        source.seek(offset)
+        position = offset
+
+        def lines():
+            nonlocal position
+            for line in iter(source.readline, b''):
+                position += len(line)
+                yield line.decode()
+
+        if data_format == 'ndjson':
+            for line in lines():
+                if line.strip():
+                    yield json.loads(line), position
+        else:
+            # csv.reader pulls more lines for quoted multi-line values,
+            # so ``position`` always ends on a record boundary.
+            for row in csv.reader(lines()):
+                yield dict(zip(header, row)), position
+
+
+def decode_record(model, fields, record, data_format):
+    values = {}
+    for field in fields:
+        if field.attname not in record:
+            continue
+        value = record[field.attname]
+        if data_format == 'csv' and value == '' and field.null:
+            value = None
+        values[field.attname] = (
+            None if value is None else field.to_python(value)
+        )
+    return model(**values)
+
+
+def import_media(name, source_dir, storage=default_storage):
+    source = Path(source_dir) / name
+    if not name or storage.exists(name) or not source.exists():
+        return
+    with open(source, 'rb') as content:
+        storage.save(name, File(content))
+
+
+def insert_raw(model, objects):
+    """INSERT rows exactly as given, like the raw saves of loaddata.
+
+    bulk_create() stamps auto_now(_add) fields with the current time, so
+    their exported values are written back with bulk_update().
+    """
+    stamped = [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    exported = [[getattr(obj, name) for name in stamped] for obj in objects]
+    model._base_manager.bulk_create(objects)
+    if not stamped or not objects:
+        return
+    for obj, values in zip(objects, exported):
+        for name, value in zip(stamped, values):
+            setattr(obj, name, value)
+    model._base_manager.bulk_update(objects, stamped)
+
+
+def save_batch(model, objects):
+    """Upsert ``objects`` by primary key; return the pks of updated rows."""
+    pks = [obj.pk for obj in objects]
+    existing = set(
+        model._base_manager.filter(pk__in=pks).values_list('pk', flat=True)
+    )
+    fields = [
+        field.attname for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    insert_raw(model, [obj for obj in objects if obj.pk not in existing])
+    updated = [obj for obj in objects if obj.pk in existing]
+    if updated:
+        model._base_manager.bulk_update(updated, fields)
+    return [obj.pk for obj in updated]
+
+
+def batch_tags(model, objects, updated_pks):
+    """Cache tags of content changed by an imported batch."""
+    tags = [f'{model._meta.model_name}:{pk}' for pk in updated_pks]
+    if model is Comment:
+        tags += [f'post:{obj.post_id}' for obj in objects]
+    return tags
+
+
+def import_model(model, directory, data_format, checkpoint,
+                 batch_size=2000, progress=None):
+    """Upsert the rows of ``model`` from its file, resuming if possible."""
+    path = data_path(directory, model, data_format)
+    state = checkpoint.get(model)
+    if state.get('done') or not path.exists():
+        return 0
+    fields = model._meta.concrete_fields
+    media_fields = file_fields(model)
+    imported = state.get('rows', 0)
+    records = read_records(path, data_format, state.get('offset', 0))
+    for batch in batched(records, batch_size):
+        objects = [
+            decode_record(model, fields, record, data_format)
+            for record, _ in batch
+        ]
+        with transaction.atomic():
+            updated = save_batch(model, objects)
+        for obj in objects:
+            for field in media_fields:
+                import_media(
+                    getattr(obj, field.name).name,
+                    Path(directory) / MEDIA_DIR,
+                )
+        tags = batch_tags(model, objects, updated)
+        if tags:
+            bump_versions(*tags)
+        imported += len(objects)
+        checkpoint.save(model, offset=batch[-1][1], rows=imported)
+        if progress:
+            progress(model, imported)
+    checkpoint.save(model, done=True, rows=imported)
+    return imported
+
+
+def import_data(directory, data_format='ndjson', batch_size=2000,
+                restart=False, progress=None):
+    """Import every model in MODELS from ``directory``."""
+    checkpoint = Checkpoint(Path(directory) / IMPORT_CHECKPOINT)
+    if restart:
+        checkpoint.clear()
+    totals = {
+        model: import_model(
+            model, directory, data_format, checkpoint,
+            batch_size=batch_size, progress=progress,
+        )
+        for model in MODELS
+    }
+    # Rows were inserted with explicit ids: move the sequences past them.
+    statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    bump_versions(CATEGORIES_TAG, LOCATIONS_TAG, FEED_TAG, POSTS_TAG)
+    # is_live was exported earlier; posts may have come due since.
+    publish_due_posts()
+    checkpoint.clear()
+    return totals
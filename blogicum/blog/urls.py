@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -10,6 +10,26 @@ urlpatterns = [
         views.BlogIndexListView.as_view(),
         name="index"
     ),
+    path(
+        "feed/",
+        views.HomeTimelineListView.as_view(),
+        name="home"
+    ),
+    path(
+        "search/",
+        views.PostSearchView.as_view(),
+        name="search"
+    ),
+    path(
+        "feeds/rss/",
+        feeds.PostFeed(),
+        name="feed_rss"
+    ),
+    path(
+        "feeds/atom/",
+        feeds.AtomPostFeed(),
+        name="feed_atom"
+    ),
     path(
         "posts/<int:pk>/",
         views.PostDetailView.as_view(),
@@ -20,11 +40,41 @@ urlpatterns = [
         views.BlogCategoryListView.as_view(),
         name="category_posts",
     ),
+    path(
+        "category/<slug:category_slug>/rss/",
+        feeds.CategoryPostFeed(),
+        name="category_feed_rss",
+    ),
+    path(
+        "category/<slug:category_slug>/atom/",
+        feeds.AtomCategoryPostFeed(),
+        name="category_feed_atom",
+    ),
     path(
         "profile/<str:username>/",
         views.AuthorProfileListView.as_view(),
         name="profile",
     ),
+    path(
+        "profile/<str:username>/follow/",
+        views.FollowView.as_view(),
+        name="follow",
+    ),
+    path(
+        "profile/<str:username>/unfollow/",
+        views.UnfollowView.as_view(),
+        name="unfollow",
+    ),
+    path(
+        "profile/<str:username>/rss/",
+        feeds.AuthorPostFeed(),
+        name="profile_feed_rss",
+    ),
+    path(
+        "profile/<str:username>/atom/",
+        feeds.AtomAuthorPostFeed(),
+        name="profile_feed_atom",
+    ),
     path(
         "posts/create/",
         views.PostCreateView.as_view(),
@@ -45,6 +95,11 @@ urlpatterns = [
         views.CommentCreateView.as_view(),
         name="add_comment",
     ),
+    path(
+        "posts/<int:pk>/comments/",
+        views.CommentListView.as_view(),
+        name="comments",
+    ),
     path(
         "posts/<int:pk>/edit_comment/<int:comment_pk>/",
         views.CommentUpdateView.as_view(),
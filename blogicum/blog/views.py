@@ -1,7 +1,8 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
-from django.db.models import Count
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -16,19 +17,47 @@ from .forms import (
     CreatePostForm,
     UserForm,
 )
-from .models import Category, Comment, Post, User
+from .lookups import published_category_by_slug
+from .models import Comment, Follow, Post, User
+from .paginators import KeysetPaginator
+from .search import search_posts
+from .timelines import (
+    author_posts,
+    cached_author_id,
+    followed_authors,
+    home_page,
+    home_posts,
+    profile_author,
+    remember_author_id,
+    timeline_page,
+)
+from config import COMMENTS_PER_PAGE
 from .mixins import (
+    AnonymousPageCacheMixin,
     CommentEditMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    ListSubjectMixin,
     PostsEditMixin,
     SuccessUrlMixin,
     VisiblePostsMixin,
-    PostDetailsMixin
+    PostConditionalGetMixin,
+    PostDetailsMixin,
+    PostPageCacheMixin,
 )
 
 
 PAGINATED_BY = 10
 
 
+def post_comments(post_id):
+    return (
+        Comment.objects.filter(post_id=post_id)
+        .select_related("author")
+        .order_by("created_at", "id")
+    )
+
+
 class PostCreateView(PostsEditMixin, LoginRequiredMixin, CreateView):
     form_class = CreatePostForm
 
@@ -75,7 +104,8 @@ class CommentCreateView(
     def form_valid(self, form):
         form.instance.post = get_object_or_404(Post, pk=self.kwargs["pk"])
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        with transaction.atomic():
+            return super().form_valid(form)
 
 
 class CommentDeleteView(
@@ -89,7 +119,8 @@ class CommentDeleteView(
         comment = get_object_or_404(Comment, pk=self.kwargs["comment_pk"])
         if self.request.user != comment.author:
             return redirect("blog:post_detail", pk=self.kwargs["pk"])
-        return super().delete(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().delete(request, *args, **kwargs)
 
 
 class CommentUpdateView(
@@ -108,83 +139,190 @@ class CommentUpdateView(
         return super().dispatch(request, *args, **kwargs)
 
 
-class AuthorProfileListView(VisiblePostsMixin, ListView):
+class AuthorProfileListView(
+    ConditionalGetMixin,
+    ListSubjectMixin,
+    KeysetPaginationMixin,
+    ListView
+):
     model = Post
     template_name = "blog/profile.html"
     paginate_by = PAGINATED_BY
+    subject_context_name = "profile"
 
-    def get_queryset(self):
-        if self.request.user.username == self.kwargs["username"]:
-            return (
-                self.request.user.posts.select_related(
-                    "category",
-                    "author",
-                    "location",
-                )
-                .all()
-                .annotate(comment_count=Count("comments"))
-                .order_by('-pub_date')
-            )
+    def is_owner(self):
+        return self.request.user.username == self.kwargs["username"]
+
+    @property
+    def fetch_subject_concurrently(self):
+        # Pages need the author's id: only a remembered one lets the
+        # author and the page be fetched at once.
+        return not self.is_owner() and (
+            cached_author_id(self.kwargs["username"]) is not None
+        )
+
+    def get_subject(self):
+        if self.is_owner():
+            return self.request.user
+        author = profile_author(self.kwargs["username"], self.request.user)
+        remember_author_id(author)
+        return author
+
+    def page_matches_subject(self):
+        return self.author_id == self.subject.pk
 
+    def get_queryset(self):
+        if self.subject is not None:
+            self.author_id = self.subject.pk
+        else:
+            self.author_id = cached_author_id(self.kwargs["username"])
+        return author_posts(self.author_id, owner=self.is_owner())
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        page = timeline_page(
+            self.request, self.author_id, self.is_owner(), page_size
+        )
         return (
-            super()
-            .visible_posts_queryset()
-            .filter(author__username=self.kwargs["username"])
-            .annotate(comment_count=Count("comments"))
-            .order_by('-pub_date')
+            page.paginator, page, page.object_list, page.has_other_pages()
         )
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["profile"] = get_object_or_404(
-            User, username=self.kwargs["username"]
+
+class HomeTimelineListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    ListView
+):
+    """Posts of the authors the user follows, newest first."""
+
+    model = Post
+    template_name = "blog/home.html"
+    context_object_name = "post_list"
+    paginate_by = PAGINATED_BY
+
+    def get_queryset(self):
+        authors, _ = followed_authors(self.request.user.pk)
+        return home_posts(authors)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        page = home_page(self.request, self.request.user.pk, page_size)
+        return (
+            page.paginator, page, page.object_list, page.has_other_pages()
         )
-        return context
 
 
-class BlogIndexListView(VisiblePostsMixin, ListView):
+class FollowView(LoginRequiredMixin, View):
+    """Subscribes the user to an author's posts."""
+
+    http_method_names = ["post"]
+
+    def post(self, request, username):
+        author = get_object_or_404(User, username=username)
+        if author != request.user:
+            Follow.objects.get_or_create(follower=request.user, author=author)
+        return redirect("blog:profile", username=username)
+
+
+class UnfollowView(LoginRequiredMixin, View):
+    """Cancels the user's subscription to an author's posts."""
+
+    http_method_names = ["post"]
+
+    def post(self, request, username):
+        author = get_object_or_404(User, username=username)
+        Follow.objects.filter(follower=request.user, author=author).delete()
+        return redirect("blog:profile", username=username)
+
+
+class BlogIndexListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    KeysetPaginationMixin,
+    VisiblePostsMixin,
+    ListView
+):
     model = Post
     template_name = "blog/index.html"
     context_object_name = "post_list"
     paginate_by = PAGINATED_BY
 
     def get_queryset(self):
-        return super().visible_posts_queryset().annotate(
-            comment_count=Count("comments"))
+        return super().visible_posts_queryset()
 
 
-class BlogCategoryListView(VisiblePostsMixin, ListView):
+class BlogCategoryListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    ListSubjectMixin,
+    KeysetPaginationMixin,
+    VisiblePostsMixin,
+    ListView
+):
     model = Post
     template_name = "blog/category.html"
     context_object_name = "post_list"
     paginate_by = PAGINATED_BY
+    subject_context_name = "category"
+    # Categories come from the in-process lookup table: there is no
+    # query to overlap with, and the posts query can use the id.
+    fetch_subject_concurrently = False
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["category"] = get_object_or_404(
-            Category, slug=self.kwargs["category_slug"], is_published=True
-        )
-        return context
+    def get_subject(self):
+        category = published_category_by_slug(self.kwargs["category_slug"])
+        if category is None:
+            raise Http404("Категория не найдена.")
+        return category
 
     def get_queryset(self):
         return (
             super()
             .visible_posts_queryset()
-            .filter(category__slug=self.kwargs["category_slug"])
-            .annotate(comment_count=Count("comments"))
+            .filter(category=self.subject)
         )
 
 
-class PostDetailView(DetailView, PostDetailsMixin):
+class PostSearchView(VisiblePostsMixin, ListView):
+    template_name = "blog/search.html"
+    context_object_name = "post_list"
+    paginate_by = PAGINATED_BY
+
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def get_queryset(self):
+        query = self.get_search_query()
+        if not query:
+            return []
+        return search_posts(query, super().visible_posts_queryset())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.get_search_query()
+        return context
+
+
+class PostDetailView(
+    PostConditionalGetMixin,
+    PostPageCacheMixin,
+    DetailView,
+    PostDetailsMixin
+):
     model = Post
     template_name = "blog/detail.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CreateCommentForm()
-        context["comments"] = (
-            self.object.comments.prefetch_related("author").all()
-        )
+        context["comments"] = self.page_comments = KeysetPaginator(
+            post_comments(self.object.pk),
+            COMMENTS_PER_PAGE,
+            keys=("created_at", "id"),
+            descending=False,
+        ).page()
         return context
 
     def get_queryset(self):
@@ -193,6 +331,29 @@ class PostDetailView(DetailView, PostDetailsMixin):
         )
 
 
+class CommentListView(PostDetailsMixin, KeysetPaginationMixin, ListView):
+    """Next page of a post's comments for the "load more" link."""
+
+    template_name = "includes/comments_page.html"
+    context_object_name = "comments"
+    paginate_by = COMMENTS_PER_PAGE
+    keyset_keys = ("created_at", "id")
+    keyset_descending = False
+
+    def get_queryset(self):
+        self.post = get_object_or_404(
+            self.post_details_queryset(author=self.request.user),
+            pk=self.kwargs["pk"],
+        )
+        return post_comments(self.post.pk)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["post"] = self.post
+        context["comments"] = context["page_obj"]
+        return context
+
+
 class ProfileView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         template_name = "blog/profile.html"
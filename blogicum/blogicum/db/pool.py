@@ -0,0 +1,201 @@
+"""Process-wide pools of open database connections.
+
+Django gives every thread its own connection and, with CONN_MAX_AGE = 0,
+closes it when a request finishes, so each request pays for opening a
+new one. The backends in blogicum.db.backends hand a closed connection
+back to the pool of its alias instead, and take their next connection
+from there. Pools are configured by the ``POOL`` entry of a database:
+
+``SIZE``
+    how many idle connections a process keeps; the rest are closed.
+    0 turns pooling off.
+``MAX_AGE``
+    seconds after which a connection is closed instead of reused.
+``HEALTH_CHECK_AFTER``
+    a connection idle for longer is checked with ``SELECT 1`` before
+    it is handed out, so one the server dropped is never used.
+
+Only connections in autocommit mode, outside any transaction and
+without unhandled errors go back to a pool. A pool belongs to the
+database its connections were opened to: when the NAME, HOST, PORT or
+USER of an alias changes, as they do while the test database is created,
+the alias gets a new pool and the old connections are closed.
+"""
+import threading
+import time
+from collections import deque
+from time import perf_counter
+
+PARAMS = ('NAME', 'HOST', 'PORT', 'USER')
+
+DEFAULTS = {
+    'SIZE': 4,
+    'MAX_AGE': 600,
+    'HEALTH_CHECK_AFTER': 30,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def is_usable(raw):
+    try:
+        cursor = raw.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+def close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """Idle connections to one database, newest on top."""
+
+    def __init__(self, size, max_age, health_check_after, params=None):
+        self.size = size
+        self.max_age = max_age
+        self.health_check_after = health_check_after
+        self.params = params
+        self._idle = deque()
+        self._created_at = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                'opened': 0,
+                'reused': 0,
+                'released': 0,
+                'discarded': 0,
+                'failed_checks': 0,
+                'connect_seconds': 0.0,
+            }
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    def acquire(self, connect):
+        """Return an idle healthy connection or a new one from connect()."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                raw, released_at = self._idle.pop()
+            now = time.monotonic()
+            if now - self._created_at.get(id(raw), now) > self.max_age:
+                self.discard(raw)
+                continue
+            if now - released_at > self.health_check_after and (
+                not is_usable(raw)
+            ):
+                self._count('failed_checks')
+                self.discard(raw)
+                continue
+            self._count('reused')
+            return raw
+        started = perf_counter()
+        raw = connect()
+        self._count('connect_seconds', perf_counter() - started)
+        self._count('opened')
+        with self._lock:
+            self._created_at[id(raw)] = time.monotonic()
+        return raw
+
+    def release(self, raw):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((raw, time.monotonic()))
+                self.stats['released'] += 1
+                return
+        self.discard(raw)
+
+    def discard(self, raw):
+        with self._lock:
+            self._created_at.pop(id(raw), None)
+            self.stats['discarded'] += 1
+        close_quietly(raw)
+
+    def clear(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+        for raw in idle:
+            self.discard(raw)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                'size': self.size,
+                'idle': len(self._idle),
+                'connect_seconds': round(self.stats['connect_seconds'], 6),
+            }
+
+
+def connection_params(settings_dict):
+    return tuple(str(settings_dict.get(name) or '') for name in PARAMS)
+
+
+def get_pool(alias, settings_dict):
+    """Pool of the alias, replaced if the alias now names another database."""
+    params = connection_params(settings_dict)
+    with _pools_lock:
+        stale = _pools.get(alias)
+        if stale is not None and stale.params == params:
+            return stale
+        options = {**DEFAULTS, **settings_dict.get('POOL', {})}
+        pool = _pools[alias] = ConnectionPool(
+            options['SIZE'],
+            options['MAX_AGE'],
+            options['HEALTH_CHECK_AFTER'],
+            params,
+        )
+    if stale is not None:
+        stale.clear()
+    return pool
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.snapshot() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """Takes connections from the alias's pool and returns them there."""
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        self.connection_pool = self.pool
+        return self.connection_pool.acquire(lambda: connect(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = self.connection_pool
+        reusable = (
+            pool is self.pool
+            and not self.in_atomic_block
+            and not self.errors_occurred
+            and self.get_autocommit()
+        )
+        if reusable:
+            pool.release(self.connection)
+        else:
+            pool.discard(self.connection)
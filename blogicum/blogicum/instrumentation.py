@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+from blogicum.db.pool import pool_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries and their total duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.count += 1
+                self.duration += perf_counter() - started
+
+
+# Timer of the request being served. Context variables follow the
+# request into sync_to_async() worker threads, so queries an async view
+# runs there are counted too.
+_current_timer = ContextVar('query_timer', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class RequestStats:
+    """Per-view totals of everything InstrumentationMiddleware measures."""
+
+    FIELDS = ('queries', 'sql_ms', 'template_ms', 'total_ms', 'bytes')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, **values):
+        with self._lock:
+            stats = self._views.setdefault(
+                view_name,
+                {
+                    'requests': 0,
+                    'max_queries': 0,
+                    **dict.fromkeys(self.FIELDS, 0),
+                },
+            )
+            stats['requests'] += 1
+            stats['max_queries'] = max(stats['max_queries'], values['queries'])
+            for field in self.FIELDS:
+                stats[field] += values[field]
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: dict(stats) for name, stats in self._views.items()}
+        for stats in views.values():
+            for field in self.FIELDS:
+                stats[f'avg_{field}'] = round(
+                    stats[field] / stats['requests'], 3
+                )
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+request_stats = RequestStats()
+
+
+class InstrumentationMiddleware:
+    """Measures SQL, template and total time of every request.
+
+    Results go to the Server-Timing header and to ``request_stats``.
+    When a view listed in settings.QUERY_BUDGETS runs more queries than
+    its budget, a warning is logged, or QueryBudgetExceeded is raised if
+    settings.QUERY_BUDGET_STRICT is on (used by the test suite).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timer, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, timer)
+
+    async def __acall__(self, request):
+        timer, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, timer)
+
+    @staticmethod
+    def start(request):
+        # Connections opened before this module was imported missed
+        # the connection_created signal.
+        for connection in connections.all():
+            install_query_recorder(connection)
+        timer = QueryTimer()
+        request._template_time = 0.0
+        request._started = perf_counter()
+        return timer, _current_timer.set(timer)
+
+    def finish(self, request, response, timer):
+        total = perf_counter() - request._started
+        view_name = (
+            request.resolver_match.view_name
+            if request.resolver_match else 'unresolved'
+        )
+        size = 0 if response.streaming else len(response.content)
+        response['Server-Timing'] = (
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+            f', tpl;dur={request._template_time * 1000:.1f}'
+            f', total;dur={total * 1000:.1f}'
+        )
+        request_stats.record(
+            view_name,
+            queries=timer.count,
+            sql_ms=timer.duration * 1000,
+            template_ms=request._template_time * 1000,
+            total_ms=total * 1000,
+            bytes=size,
+        )
+        self.check_budget(view_name, timer.count)
+        return response
+
+    def process_template_response(self, request, response):
+        started = perf_counter()
+
+        def stop_timer(rendered):
+            request._template_time += perf_counter() - started
+
+        response.add_post_render_callback(stop_timer)
+        return response
+
+    @staticmethod
+    def check_budget(view_name, queries):
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+        if budget is None or queries <= budget:
+            return
+        message = f'{view_name}: {queries} SQL queries, budget is {budget}'
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+@staff_member_required
+def stats_view(request):
+    return JsonResponse({
+        'views': request_stats.snapshot(),
+        'db_pools': pool_stats(),
+    })
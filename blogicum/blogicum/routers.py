@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# Reads go to the primary unless a request allows replicas, so
+# management commands, the shell and jobs never see a lagging copy.
+_pinned = ContextVar('pinned_to_primary', default=True)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+@contextmanager
+def pin_to_primary():
+    """Send every read inside the block to the primary database."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def allow_replicas():
+    """Let blog reads inside the block go to the replicas."""
+    token = _pinned.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+    """Reads blog models from a random replica, writes to the primary.
+
+    Only safe requests of clients without a pin cookie read from the
+    replicas, see ReadYourWritesMiddleware; everything else reads from
+    the primary.
+    """
+
+    route_app_labels = {'blog'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        replicas = replica_aliases()
+        if _pinned.get() or not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client to the primary for a while after it writes.
+
+    Safe requests may read from the replicas. A write request sets a
+    short-lived cookie; while the cookie is alive every read of that
+    client goes to the primary, so replica lag never hides the client's
+    own changes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = self.pin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = self.pin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.process_response(request, response)
+
+    @staticmethod
+    def pin(request):
+        writes = request.method not in SAFE_METHODS
+        return _pinned.set(writes or PIN_COOKIE in request.COOKIES)
+
+    @staticmethod
+    def process_response(request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE,
+                str(int(time.time())),
+                max_age=settings.PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -23,6 +24,8 @@ ALLOWED_HOSTS = [
 INSTALLED_APPS = [
     'pages.apps.PagesConfig',
     'blog.apps.BlogConfig',
+    'jobs.apps.JobsConfig',
+    'outbox.apps.OutboxConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -33,11 +36,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blogicum.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blogicum.routers.ReadYourWritesMiddleware',
+    'blog.publishing.ScheduledPostsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,10 +70,87 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
-DATABASES = {
+# Connections go back to a per-process pool instead of being closed,
+# see blogicum.db.pool. With CONN_MAX_AGE > 0 a thread also keeps its
+# connection between requests.
+DB_POOL = {
+    'SIZE': int(os.getenv('BLOGICUM_DB_POOL_SIZE', '4')),
+    'MAX_AGE': int(os.getenv('BLOGICUM_DB_POOL_MAX_AGE', '600')),
+    'HEALTH_CHECK_AFTER': float(
+        os.getenv('BLOGICUM_DB_POOL_HEALTH_CHECK_AFTER', '30')
+    ),
+}
+
+CONN_MAX_AGE = int(os.getenv('BLOGICUM_DB_CONN_MAX_AGE', '0'))
+
+if os.getenv('BLOGICUM_DB_ENGINE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'blogicum.db.backends.postgresql',
+            'NAME': os.getenv('BLOGICUM_DB_NAME', 'blogicum'),
+            'USER': os.getenv('BLOGICUM_DB_USER', ''),
+            'PASSWORD': os.getenv('BLOGICUM_DB_PASSWORD', ''),
+            'HOST': os.getenv('BLOGICUM_DB_HOST', ''),
+            'PORT': os.getenv('BLOGICUM_DB_PORT', ''),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'POOL': DB_POOL,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'blogicum.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'POOL': DB_POOL,
+        }
+    }
+
+# Comma separated SQLite files used as read replicas,
+# e.g. BLOGICUM_DB_REPLICAS=replica1.sqlite3,replica2.sqlite3
+for index, name in enumerate(
+    filter(None, os.getenv('BLOGICUM_DB_REPLICAS', '').split(',')), start=1
+):
+    DATABASES[f'replica_{index}'] = {
+        'ENGINE': 'blogicum.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'POOL': DB_POOL,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['blogicum.routers.ReplicaRouter']
+
+PRIMARY_PIN_SECONDS = 5
+
+# Let async views run independent queries in parallel threads, each with
+# its own connection. Parallel readers gain nothing on SQLite.
+CONCURRENT_QUERIES = not DATABASES['default']['ENGINE'].endswith('sqlite3')
+
+# Maximum number of SQL queries per request, by URL name.
+QUERY_BUDGETS = {
+    'blog:index': 3,
+    'blog:category_posts': 3,
+    'blog:profile': 5,
+    'blog:post_detail': 4,
+    'blog:comments': 4,
+    'blog:search': 5,
+    'blog_async:index': 3,
+    'blog_async:category_posts': 3,
+    'blog_async:profile': 5,
+    'blog_async:post_detail': 4,
+}
+
+QUERY_BUDGET_STRICT = False
+
+# Where queued background jobs run: 'eager' (at once, in the request),
+# 'thread' (a thread pool of the web process) or 'worker' (only the
+# run_jobs command).
+JOBS_EXECUTOR = os.getenv('BLOGICUM_JOBS_EXECUTOR', 'thread')
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -113,6 +196,14 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Used when EMAIL_BACKEND is switched to SMTP. Mail is queued in the
+# outbox and sent in the background, see outbox.delivery.
+EMAIL_HOST = os.getenv('BLOGICUM_EMAIL_HOST', 'localhost')
+
+EMAIL_PORT = int(os.getenv('BLOGICUM_EMAIL_PORT', '25'))
+
+EMAIL_TIMEOUT = 10
+
 
 MEDIA_ROOT = BASE_DIR / "media/"
 
@@ -2,24 +2,28 @@ from django.contrib import admin
 from django.urls import include, path
 
 from django.conf import settings
-from django.contrib.auth.forms import UserCreationForm
-from django.views.generic.edit import CreateView
+from django.contrib.auth.views import PasswordResetView
 
 from django.conf.urls.static import static
-from django.urls import include, path, reverse_lazy
+from blogicum.instrumentation import stats_view
+from outbox.forms import OutboxPasswordResetForm
+from outbox.views import RegistrationView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('stats/requests/', stats_view, name='request_stats'),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('async/', include('blog.async_urls', namespace='blog_async')),
     path('', include('blog.urls', namespace='blog')),
+    path(
+        'auth/password_reset/',
+        PasswordResetView.as_view(form_class=OutboxPasswordResetForm),
+        name='password_reset',
+    ),
     path("auth/", include("django.contrib.auth.urls")),
     path(
         'auth/registration/',
-        CreateView.as_view(
-            template_name='registration/registration_form.html',
-            form_class=UserCreationForm,
-            success_url=reverse_lazy('pages:about'),
-        ),
+        RegistrationView.as_view(),
         name='registration',
     ),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
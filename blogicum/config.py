@@ -1,3 +1,36 @@
 MAX_LENGTH_NAME = 256
 POSTS_ON_PAGE = 5
 MAX_TITLE_LENGTH = 35
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_TIMEOUT = 60 * 10
+IMAGE_DERIVATIVE_WIDTHS = {
+    'card': 640,
+    'detail': 1280,
+    'retina': 2560,
+}
+SEARCH_MAX_RESULTS = 1000
+COMMENTS_PER_PAGE = 20
+QUERY_WORKERS = 8
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+FEED_DESCRIPTION_WORDS = 60
+PUBLISH_BATCH_SIZE = 500
+PUBLISH_CHECK_INTERVAL = 30
+PUBLISH_LOOP_INTERVAL = 60
+TIMELINE_CACHE_TIMEOUT = 60 * 60 * 24
+HOME_TIMELINE_LENGTH = 500
+CELEBRITY_FOLLOWERS = 1000
+FAN_OUT_BATCH_SIZE = 500
+FOLLOWING_CACHE_TIMEOUT = 60 * 10
+JOB_WORKERS = 2
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 30
+JOB_LOCK_TIMEOUT = 60 * 10
+JOB_POLL_INTERVAL = 1
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_RATE_LIMIT = 10
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_LOCK_TIMEOUT = 60 * 10
+OUTBOX_CONNECTION_IDLE = 60
+OUTBOX_POLL_INTERVAL = 5
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.action(description='Поставить в очередь заново')
+def requeue(modeladmin, request, queryset):
+    queryset.update(
+        status=Job.QUEUED, attempts=0, run_after=timezone.now()
+    )
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'priority',
+        'attempts',
+        'run_after',
+        'created_at',
+    )
+    list_filter = ('status', 'name')
+    actions = (requeue,)
+
+
+admin.site.register(Job, JobAdmin)
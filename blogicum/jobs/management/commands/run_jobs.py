@@ -0,0 +1,74 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from config import JOB_POLL_INTERVAL, JOB_WORKERS
+from jobs.pool import init_process, run_in_pool
+from jobs.queue import claim_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди, в том числе отложенные '
+        'и повторные попытки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=JOB_WORKERS,
+            help='Сколько задач выполнять одновременно.',
+        )
+        parser.add_argument(
+            '--pool',
+            choices=('thread', 'process'),
+            default='thread',
+            help='Выполнять задачи в потоках или в отдельных процессах.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди, сек.',
+        )
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        with self.make_pool(options['pool'], options['workers']) as pool:
+            while True:
+                claimed = claim_jobs(options['workers'])
+                if claimed:
+                    for succeeded in pool.map(run_in_pool, claimed):
+                        done += succeeded
+                        failed += not succeeded
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                close_old_connections()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        ))
+
+    @staticmethod
+    def make_pool(kind, workers):
+        if kind == 'thread':
+            return ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='jobs'
+            )
+        # Spawned processes set Django up afresh instead of sharing
+        # the database connections of a forked parent.
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_process,
+        )
@@ -0,0 +1,83 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A queued call of a registered task, see jobs.queue."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name='Задача',
+    )
+    args = models.JSONField(
+        default=list,
+        verbose_name='Позиционные аргументы',
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        verbose_name='Именованные аргументы',
+    )
+    priority = models.SmallIntegerField(
+        default=0,
+        verbose_name='Приоритет',
+        help_text='Задачи с большим приоритетом выполняются раньше.',
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name='Состояние',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Наибольшее число попыток',
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить не раньше',
+    )
+    locked_by = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Исполнитель',
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('-priority', 'run_after', 'id')
+        indexes = [
+            models.Index(
+                fields=['-priority', 'run_after', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_queued_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,21 @@
+"""Entry points of the worker pools of ``run_jobs``.
+
+Spawned processes import this module before Django is set up, so it
+must not import models at module level.
+"""
+from django.db import close_old_connections
+
+
+def init_process():
+    import django
+
+    django.setup()
+
+
+def run_in_pool(job_id):
+    from .queue import execute_job
+
+    try:
+        return execute_job(job_id)
+    finally:
+        close_old_connections()
@@ -0,0 +1,185 @@
+"""Database-backed queue of background jobs.
+
+Functions decorated with @task can be queued with ``func.delay(...)``,
+or with ``func.delay_until(when, ...)`` to run no earlier than ``when``:
+a Job row is inserted in the caller's transaction and handed to the
+executor named by settings.JOBS_EXECUTOR once the transaction commits.
+
+``eager``
+    the job runs right away in the committing thread (tests);
+``thread``
+    the job runs in a local thread pool of JOB_WORKERS threads;
+``worker``
+    nothing runs in the web process, the ``run_jobs`` command picks
+    queued jobs up.
+
+A failed job goes back to the queue with an exponential delay until it
+has been tried ``max_attempts`` times; only ``run_jobs`` runs delayed
+and retried jobs. Jobs whose worker died are taken again after
+JOB_LOCK_TIMEOUT.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from blogicum.routers import pin_to_primary
+from config import (
+    JOB_LOCK_TIMEOUT,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_DELAY,
+    JOB_WORKERS,
+)
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+_executor = ThreadPoolExecutor(
+    max_workers=JOB_WORKERS, thread_name_prefix='jobs'
+)
+
+
+def task(priority=0, max_attempts=JOB_MAX_ATTEMPTS):
+    """Register a function as a task that can be queued with ``delay``.
+
+    Arguments of queued calls must be JSON serializable.
+    """
+    def register(function):
+        function.task_name = f'{function.__module__}.{function.__name__}'
+        function.priority = priority
+        function.max_attempts = max_attempts
+        function.delay = (
+            lambda *args, **kwargs: enqueue(function, *args, **kwargs)
+        )
+        function.delay_until = (
+            lambda run_after, *args, **kwargs: schedule(
+                function, run_after, *args, **kwargs
+            )
+        )
+        registry[function.task_name] = function
+        return function
+
+    return register
+
+
+def enqueue(function, *args, **kwargs):
+    """Queue a call of the task ``function`` and return its Job."""
+    return schedule(function, timezone.now(), *args, **kwargs)
+
+
+def schedule(function, run_after, *args, **kwargs):
+    """Queue a call of ``function`` to run no earlier than ``run_after``.
+
+    Until then the executors skip the job and ``run_jobs`` picks it up.
+    """
+    job = Job.objects.create(
+        name=function.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        priority=function.priority,
+        max_attempts=function.max_attempts,
+        run_after=run_after,
+    )
+    transaction.on_commit(lambda: dispatch(job.pk))
+    return job
+
+
+def dispatch(job_id):
+    if settings.JOBS_EXECUTOR == 'eager':
+        run_job(job_id)
+    elif settings.JOBS_EXECUTOR == 'thread':
+        _executor.submit(_run_in_thread, job_id)
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def claimable(now):
+    return Q(status=Job.QUEUED, run_after__lte=now) | Q(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=JOB_LOCK_TIMEOUT),
+    )
+
+
+def claim(jobs, now):
+    """Mark the jobs of a queryset taken; return whether it succeeded.
+
+    The status check is repeated in the UPDATE, so of two workers
+    claiming the same job only one gets it.
+    """
+    return jobs.filter(claimable(now)).update(
+        status=Job.RUNNING,
+        locked_by=worker_name(),
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+
+
+def claim_jobs(limit):
+    """Take up to ``limit`` due jobs, most urgent first; return their ids."""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(claimable(now))
+        .order_by('-priority', 'run_after', 'id')
+        .values_list('pk', flat=True)[:limit]
+    )
+    return [
+        pk for pk in candidates
+        if claim(Job.objects.filter(pk=pk), now)
+    ]
+
+
+def execute_job(job_id):
+    """Run a claimed job; delete it on success, schedule a retry if not."""
+    job = Job.objects.get(pk=job_id)
+    try:
+        function = registry[job.name]
+        # The job usually follows a write the replicas may not have yet.
+        with pin_to_primary():
+            function(*job.args, **job.kwargs)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась с ошибкой', job)
+        fail_job(job, traceback.format_exc())
+        return False
+    job.delete()
+    return True
+
+
+def fail_job(job, error):
+    if job.attempts >= job.max_attempts:
+        changes = {'status': Job.FAILED}
+    else:
+        delay = JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        changes = {
+            'status': Job.QUEUED,
+            'run_after': timezone.now() + timedelta(seconds=delay),
+        }
+    Job.objects.filter(pk=job.pk).update(
+        last_error=error, locked_by='', locked_at=None, **changes
+    )
+
+
+def run_job(job_id):
+    """Claim and run one job if it is due; return whether it succeeded."""
+    if not claim(Job.objects.filter(pk=job_id), timezone.now()):
+        return False
+    return execute_job(job_id)
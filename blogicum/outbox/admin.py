@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+@admin.action(description='Отправить заново')
+def resend(modeladmin, request, queryset):
+    queryset.update(
+        status=OutboxMessage.PENDING, attempts=0, run_after=timezone.now()
+    )
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject',
+        'status',
+        'attempts',
+        'created_at',
+        'sent_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    actions = (resend,)
+
+
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
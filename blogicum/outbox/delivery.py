@@ -0,0 +1,176 @@
+"""Sending queued e-mails in batches.
+
+send_outbox() claims due messages a batch at a time and sends them over
+a connection that stays open between batches, see ConnectionPool. At
+most OUTBOX_RATE_LIMIT messages a second leave each process: the limit
+is counted in memory, so N sending processes may send N times as many.
+A message that cannot be sent is retried with an exponential delay and
+given up after OUTBOX_MAX_ATTEMPTS attempts.
+"""
+import logging
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from config import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_CONNECTION_IDLE,
+    OUTBOX_LOCK_TIMEOUT,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RATE_LIMIT,
+    OUTBOX_RETRY_DELAY,
+)
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Keeps one open mail connection per thread for reuse.
+
+    A connection idle for longer than OUTBOX_CONNECTION_IDLE seconds is
+    closed and opened anew, as SMTP servers drop idle clients.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self):
+        local = self._local
+        connection = getattr(local, 'connection', None)
+        now = time.monotonic()
+        if connection is not None and (
+            now - local.used_at > OUTBOX_CONNECTION_IDLE
+        ):
+            self.discard()
+            connection = None
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            local.connection = connection
+        local.used_at = now
+        return connection
+
+    def discard(self):
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception:
+            logger.warning('Не удалось закрыть почтовое соединение')
+
+
+pool = ConnectionPool()
+
+
+class RateLimiter:
+    """Counts the messages sent by this process in the current second."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._second = None
+        self._count = 0
+
+    def wait(self, rate):
+        """Wait until one more message fits into ``rate`` a second."""
+        while True:
+            with self._lock:
+                now = time.time()
+                second = int(now)
+                if second != self._second:
+                    self._second, self._count = second, 0
+                if self._count < rate:
+                    self._count += 1
+                    return
+            time.sleep(second + 1 - now)
+
+
+rate_limiter = RateLimiter()
+
+
+def throttle():
+    rate_limiter.wait(OUTBOX_RATE_LIMIT)
+
+
+def claimable(now):
+    return Q(status=OutboxMessage.PENDING, run_after__lte=now) | Q(
+        status=OutboxMessage.SENDING,
+        locked_at__lt=now - timedelta(seconds=OUTBOX_LOCK_TIMEOUT),
+    )
+
+
+def claim_messages(limit):
+    """Take up to ``limit`` due messages and return them.
+
+    The guarded UPDATE lets concurrent senders split the queue.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    candidates = list(
+        OutboxMessage.objects.filter(claimable(now))
+        .order_by('run_after', 'id')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+    OutboxMessage.objects.filter(claimable(now), pk__in=candidates).update(
+        status=OutboxMessage.SENDING,
+        locked_by=token,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(
+        OutboxMessage.objects.filter(
+            locked_by=token, status=OutboxMessage.SENDING
+        ).order_by('run_after', 'id')
+    )
+
+
+def fail_message(message, error):
+    if message.attempts >= OUTBOX_MAX_ATTEMPTS:
+        changes = {'status': OutboxMessage.FAILED}
+    else:
+        delay = OUTBOX_RETRY_DELAY * 2 ** (message.attempts - 1)
+        changes = {
+            'status': OutboxMessage.PENDING,
+            'run_after': timezone.now() + timedelta(seconds=delay),
+        }
+    OutboxMessage.objects.filter(pk=message.pk).update(
+        last_error=error, locked_by='', locked_at=None, **changes
+    )
+
+
+def send_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Send every due message; return how many were sent."""
+    sent = 0
+    while True:
+        messages = claim_messages(batch_size)
+        if not messages:
+            return sent
+        for message in messages:
+            throttle()
+            try:
+                pool.get().send_messages([message.as_email()])
+            except Exception:
+                logger.exception('Не удалось отправить письмо %s', message.pk)
+                pool.discard()
+                fail_message(message, traceback.format_exc())
+                continue
+            # Marked one by one, so a crash mid-batch resends nothing
+            # that has already gone out.
+            OutboxMessage.objects.filter(pk=message.pk).update(
+                status=OutboxMessage.SENT,
+                sent_at=timezone.now(),
+                locked_by='',
+                locked_at=None,
+            )
+            sent += 1
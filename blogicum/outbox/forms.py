@@ -0,0 +1,61 @@
+from django import forms
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
+
+from .mail import queue_mail
+
+
+class OutboxPasswordResetForm(PasswordResetForm):
+    """Password reset form that queues its e-mail in the outbox."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        # Email subject *must not* contain newlines
+        subject = ''.join(subject.splitlines())
+        html_body = ''
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(
+                html_email_template_name, context
+            )
+        queue_mail(
+            subject,
+            loader.render_to_string(email_template_name, context),
+            [to_email],
+            from_email=from_email,
+            html_body=html_body,
+        )
+
+
+class OutboxRegistrationForm(UserCreationForm):
+    """Sign-up form that queues a welcome e-mail in the outbox."""
+
+    email = forms.EmailField(
+        label='Адрес электронной почты',
+        required=False,
+        help_text='На него придёт письмо о регистрации.',
+    )
+
+    class Meta(UserCreationForm.Meta):
+        fields = (*UserCreationForm.Meta.fields, 'email')
+
+    def send_welcome_mail(self, request):
+        user = self.instance
+        if not user.email:
+            return
+        context = {
+            'user': user,
+            'domain': request.get_host(),
+            'protocol': 'https' if request.is_secure() else 'http',
+        }
+        subject = loader.render_to_string(
+            'registration/registration_email_subject.txt', context
+        )
+        queue_mail(
+            ''.join(subject.splitlines()),
+            loader.render_to_string(
+                'registration/registration_email.txt', context
+            ),
+            [user.email],
+        )
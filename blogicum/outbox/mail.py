@@ -0,0 +1,19 @@
+from .models import OutboxMessage
+from .tasks import deliver_outbox
+
+
+def queue_mail(subject, body, to, from_email=None, html_body=''):
+    """Put an e-mail into the outbox instead of sending it now.
+
+    The message is sent by a background job after the current
+    transaction commits.
+    """
+    message = OutboxMessage.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or '',
+        to=list(to),
+    )
+    deliver_outbox.delay()
+    return message
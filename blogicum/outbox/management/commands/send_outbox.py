@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from config import OUTBOX_POLL_INTERVAL
+from outbox.delivery import pool, send_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя очередь.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=OUTBOX_POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди, сек.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent = send_outbox()
+                if sent or not options['loop']:
+                    self.stdout.write(
+                        self.style.SUCCESS(f'Отправлено писем: {sent}')
+                    )
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+                close_old_connections()
+        finally:
+            pool.discard()
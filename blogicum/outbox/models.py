@@ -0,0 +1,102 @@
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """An e-mail waiting to be sent by outbox.delivery.send_outbox()."""
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField(
+        max_length=255,
+        verbose_name='Тема',
+    )
+    body = models.TextField(
+        verbose_name='Текст',
+    )
+    html_body = models.TextField(
+        blank=True,
+        verbose_name='HTML-версия',
+    )
+    from_email = models.CharField(
+        max_length=254,
+        blank=True,
+        verbose_name='Отправитель',
+    )
+    to = models.JSONField(
+        verbose_name='Получатели',
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Состояние',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Отправить не раньше',
+    )
+    locked_by = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Отправитель пачки',
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взято в отправку',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено',
+    )
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('run_after', 'id')
+        indexes = [
+            models.Index(
+                fields=['run_after', 'id'],
+                condition=models.Q(status='pending'),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {", ".join(self.to)}'
+
+    def as_email(self, connection=None):
+        email = EmailMultiAlternatives(
+            self.subject,
+            self.body,
+            self.from_email or None,
+            self.to,
+            connection=connection,
+        )
+        if self.html_body:
+            email.attach_alternative(self.html_body, 'text/html')
+        return email
@@ -0,0 +1,13 @@
+from jobs.queue import task
+
+from .delivery import pool, send_outbox
+
+
+@task(priority=20)
+def deliver_outbox():
+    try:
+        send_outbox()
+    finally:
+        # Job threads may sit idle for long; do not leave the SMTP
+        # connection open in them.
+        pool.discard()
@@ -0,0 +1,17 @@
+from django.urls import reverse_lazy
+from django.views.generic.edit import CreateView
+
+from .forms import OutboxRegistrationForm
+
+
+class RegistrationView(CreateView):
+    """Sign-up page; the welcome e-mail goes through the outbox."""
+
+    template_name = 'registration/registration_form.html'
+    form_class = OutboxRegistrationForm
+    success_url = reverse_lazy('pages:about')
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        form.send_welcome_mail(self.request)
+        return response
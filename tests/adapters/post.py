@@ -33,6 +33,9 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "updated_at",
+            "is_live",
+            "content_version",
             "refresh_from_db",
         ]
 
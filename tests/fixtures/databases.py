@@ -0,0 +1,17 @@
+import pytest
+from django.db import connections
+
+
+@pytest.fixture
+def stale_replica(settings, tmp_path):
+    """A replica alias whose database has no tables at all."""
+    replica = {
+        **connections.settings["default"],
+        "NAME": tmp_path / "replica.sqlite3",
+        "TEST": {"MIRROR": None},
+    }
+    settings.DATABASES = {**settings.DATABASES, "replica_1": replica}
+    connections.settings["replica_1"] = replica
+    yield
+    connections["replica_1"].close()
+    del connections.settings["replica_1"]
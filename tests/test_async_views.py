@@ -0,0 +1,57 @@
+import re
+
+import pytest
+
+from blog.lookups import categories, locations
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+@pytest.fixture
+def paths(post_with_published_location):
+    post = post_with_published_location
+    return [
+        "",
+        f"posts/{post.id}/",
+        f"category/{post.category.slug}/",
+        f"profile/{post.author.username}/",
+    ]
+
+
+@pytest.mark.parametrize("client_name", ["user_client", "unlogged_client"])
+def test_async_views_match_sync_views(request, client_name, paths):
+    client = request.getfixturevalue(client_name)
+    for path in paths:
+        sync_response = client.get(f"/{path}")
+        async_response = client.get(f"/async/{path}")
+        assert async_response.status_code == 200, path
+        assert CSRF_RE.sub("", async_response.content.decode()) == (
+            CSRF_RE.sub("", sync_response.content.decode())
+        ), (
+            f"Убедитесь, что асинхронная версия `/{path}` отдаёт ту же "
+            "страницу, что и синхронная."
+        )
+
+
+@pytest.mark.parametrize(
+    "path", ["posts/9999/", "category/missing/", "profile/nobody/"]
+)
+def test_async_views_not_found(client, path):
+    assert client.get(f"/async/{path}").status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_queries(settings, client, post_with_published_location):
+    settings.CONCURRENT_QUERIES = True
+    post = post_with_published_location
+    categories.rows()
+    locations.rows()
+    response = client.get(f"/async/posts/{post.id}/")
+    assert response.status_code == 200
+    assert post.title in response.content.decode()
+    assert 'desc="2 queries"' in response["Server-Timing"], (
+        "Убедитесь, что запросы из рабочих потоков учитываются "
+        "в заголовке Server-Timing."
+    )
@@ -0,0 +1,70 @@
+import pytest
+from django.conf import settings
+
+from blog import benchmark
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def report():
+    dataset = benchmark.seed_dataset(
+        users=5, categories=3, posts=40, comments=100
+    )
+    requests = benchmark.build_requests(dataset, 120)
+    samples, duration = benchmark.replay(requests, dataset, warmup=20)
+    return benchmark.summarize(samples, duration)
+
+
+def test_benchmark_covers_request_mix(report):
+    assert report["requests"] == 100
+    assert report["requests_per_second"] > 0
+    assert set(report["endpoints"]) <= set(benchmark.REQUEST_MIX)
+    for endpoint, stats in report["endpoints"].items():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"], (
+            f"Убедитесь, что перцентили задержек `{endpoint}` упорядочены."
+        )
+
+
+def test_benchmark_queries_within_budgets(report):
+    for endpoint, stats in report["endpoints"].items():
+        budget = settings.QUERY_BUDGETS.get(f"blog:{endpoint}")
+        if budget is not None:
+            assert stats["max_queries"] <= budget, (
+                f"Страница `{endpoint}` выполняет {stats['max_queries']} "
+                f"SQL-запросов при бюджете {budget}."
+            )
+
+
+def test_find_regressions(report):
+    assert benchmark.find_regressions(report, report, tolerance=0) == []
+    slower = {
+        "endpoints": {
+            endpoint: {**stats, "p95_ms": stats["p95_ms"] / 10}
+            for endpoint, stats in report["endpoints"].items()
+        }
+    }
+    assert benchmark.find_regressions(report, slower, tolerance=50), (
+        "Убедитесь, что рост p95 сверх допуска считается регрессией."
+    )
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([7], 95) == 7
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_replay_of_async_views():
+    dataset = benchmark.seed_dataset(
+        users=5, categories=3, posts=40, comments=100
+    )
+    requests = benchmark.build_requests(dataset, 60, async_views=True)
+    assert any(url.startswith("/async/") for *_, url in requests)
+    samples, duration = benchmark.replay_concurrently(
+        requests, dataset, concurrency=8, warmup=10
+    )
+    report = benchmark.summarize(samples, duration)
+    assert report["requests"] == 50
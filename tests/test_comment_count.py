@@ -0,0 +1,66 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_saving_stale_post_keeps_comment_count(
+    mixer, post_with_published_location
+):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что сохранение публикации, загруженной до появления"
+        " комментариев, не сбрасывает счётчик комментариев."
+    )
+    assert post.title == "Новый заголовок"
+
+
+def test_comment_moved_to_another_post(
+    mixer, post_with_published_location, post_of_another_author
+):
+    comment = mixer.blend("blog.Comment", post=post_with_published_location)
+    comment.post = post_of_another_author
+    comment.save()
+    post_with_published_location.refresh_from_db()
+    post_of_another_author.refresh_from_db()
+    assert post_with_published_location.comment_count == 0
+    assert post_of_another_author.comment_count == 1
+
+
+def test_recount_comments_repairs_drift(
+    mixer, PostModel, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    PostModel.objects.filter(pk=post.pk).update(comment_count=40)
+
+    call_command("recount_comments")
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " счётчик комментариев."
+    )
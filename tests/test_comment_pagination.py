@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from config import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+def test_detail_shows_first_comment_page(
+    user_client, post_with_published_location, many_comments
+):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+    comments = list(response.context["comments"])
+    assert comments == many_comments[:COMMENTS_PER_PAGE], (
+        "Убедитесь, что на странице публикации показывается только первая"
+        " страница комментариев в порядке их создания."
+    )
+
+
+def test_load_more_fragment(
+    user_client, post_with_published_location, many_comments,
+    django_assert_max_num_queries
+):
+    post = post_with_published_location
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    more_url = re.search(
+        r'href="([^"]+)" data-load-more', content
+    ).group(1).replace("&amp;", "&")
+    with django_assert_max_num_queries(4):
+        response = user_client.get(more_url)
+    assert response.status_code == 200
+    assert list(response.context["comments"]) == (
+        many_comments[COMMENTS_PER_PAGE:]
+    ), "Убедитесь, что по ссылке «ещё» загружаются следующие комментарии."
+    assert b"data-load-more" not in response.content
+
+
+def test_load_more_hidden_post_is_404(
+    client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
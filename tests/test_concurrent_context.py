@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import mixins
+from blog.concurrency import run_concurrently
+from blog.publishing import refresh_next_pub_date
+from blog.timelines import AUTHOR_ID_KEY
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url", ["/profile/nobody/", "/category/missing/"]
+)
+def test_missing_subject_skips_posts_query(client, url):
+    # The date of the next deferred post is normally cached already.
+    refresh_next_pub_date()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 404
+    assert not any(
+        "blog_post" in query["sql"] for query in queries.captured_queries
+    ), (
+        "Убедитесь, что для несуществующего автора или категории "
+        "публикации не запрашиваются."
+    )
+
+
+@pytest.fixture
+def concurrent_calls(settings, monkeypatch):
+    settings.CONCURRENT_QUERIES = True
+    calls = []
+
+    def run(*functions):
+        calls.append(len(functions))
+        return run_concurrently(*functions)
+
+    monkeypatch.setattr(mixins, "run_concurrently", run)
+    return calls
+
+
+@pytest.mark.django_db(transaction=True)
+def test_profile_with_concurrent_queries(
+    concurrent_calls, client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/profile/{post.author.username}/"
+    for _ in range(2):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.context["profile"] == post.author
+        assert post.title in response.content.decode(), (
+            "Убедитесь, что при параллельных запросах профиль показывает "
+            "публикации автора."
+        )
+    assert concurrent_calls == [2], (
+        "Убедитесь, что автор профиля и страница его публикаций "
+        "запрашиваются параллельно, когда id автора уже известен."
+    )
+    assert client.get("/profile/nobody/").status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("prefix", ["", "/async"])
+def test_profile_with_stale_author_id(
+    concurrent_calls, client, prefix, post_with_published_location,
+    post_of_another_author
+):
+    post = post_with_published_location
+    cache.set(
+        AUTHOR_ID_KEY.format(post.author.username),
+        post_of_another_author.author_id,
+    )
+    content = client.get(
+        f"{prefix}/profile/{post.author.username}/"
+    ).content.decode()
+    assert post.title in content and (
+        post_of_another_author.title not in content
+    ), (
+        "Убедитесь, что профиль не показывает чужие публикации, если "
+        "запомненный id автора устарел."
+    )
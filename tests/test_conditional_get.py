@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    return post_with_published_location
+
+
+def get_etag(client, url):
+    client.get(url)
+    response = client.get(url)
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), (
+        f"Убедитесь, что страница `{url}` отдаёт заголовки ETag "
+        "и Last-Modified."
+    )
+    return response["ETag"]
+
+
+@pytest.mark.parametrize(
+    "name, args",
+    [
+        ("blog:index", lambda post: []),
+        ("blog:category_posts", lambda post: [post.category.slug]),
+        ("blog:profile", lambda post: [post.author.username]),
+        ("blog:post_detail", lambda post: [post.pk]),
+        ("blog_async:index", lambda post: []),
+        ("blog_async:post_detail", lambda post: [post.pk]),
+    ],
+)
+def test_unchanged_page_not_modified(client, post, name, args):
+    url = reverse(name, args=args(post))
+    etag = get_etag(client, url)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        f"Убедитесь, что страница `{url}` отвечает 304 Not Modified, "
+        "если с прошлого запроса ничего не изменилось."
+    )
+    post.text = "Новый текст"
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        f"Убедитесь, что после изменения поста страница `{url}` "
+        "отдаётся заново."
+    )
+
+
+def test_new_comment_changes_post_validators(client, post, mixer):
+    url = reverse("blog:post_detail", args=[post.pk])
+    etag = get_etag(client, url)
+    mixer.blend("blog.Comment", post=post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag страницы поста."
+    )
+
+
+def test_validators_depend_on_user(client, user_client, post):
+    url = reverse("blog:post_detail", args=[post.pk])
+    etag = get_etag(client, url)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что страница, полученная анонимно, не считается "
+        "актуальной для авторизованного пользователя."
+    )
@@ -0,0 +1,30 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_blog_data():
+    call_command(
+        "generate_blog_data",
+        users=20, categories=30, locations=10, posts=500, comments=2000,
+        batch_size=150, password="secret", verbosity=0,
+    )
+    assert User.objects.filter(username__startswith="gen_user_").count() == 20
+    assert Category.objects.count() == 30
+    assert Location.objects.count() == 10
+    assert Post.objects.count() == 500
+    assert Comment.objects.count() == 2000
+    assert Post.objects.recount_comments() == 0, (
+        "Убедитесь, что сгенерированные счётчики комментариев совпадают "
+        "с числом комментариев."
+    )
+    assert User.objects.first().check_password("secret")
+
+    top_post = Post.objects.order_by("-comment_count").first()
+    assert top_post.comment_count > 2000 / 500 * 10, (
+        "Убедитесь, что комментарии сосредоточены на популярных публикациях."
+    )
+    assert Category.objects.filter(is_published=False).exists()
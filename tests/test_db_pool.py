@@ -0,0 +1,122 @@
+import pytest
+from django.db.utils import ConnectionHandler
+from django.urls import reverse
+
+from blogicum.db import pool as db_pool
+
+ALIAS = "pooled"
+
+
+@pytest.fixture
+def make_connection(tmp_path, django_db_blocker):
+    handlers = []
+
+    def make(**options):
+        handler = ConnectionHandler({
+            "default": {"ENGINE": "django.db.backends.sqlite3"},
+            ALIAS: {
+                "ENGINE": "blogicum.db.backends.sqlite3",
+                "NAME": tmp_path / "pooled.sqlite3",
+                "POOL": {"SIZE": 1, **options},
+            },
+        })
+        handlers.append(handler)
+        return handler[ALIAS]
+
+    # The connections use their own database file, not the test database.
+    with django_db_blocker.unblock():
+        yield make
+        for handler in handlers:
+            handler.close_all()
+    db_pool._pools.pop(ALIAS, db_pool.ConnectionPool(0, 0, 0)).clear()
+
+
+def query(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def test_closed_connection_reused(make_connection):
+    connection = make_connection()
+    query(connection)
+    raw = connection.connection
+    connection.close()
+    query(connection)
+    assert connection.connection is raw, (
+        "Убедитесь, что закрытое соединение возвращается в пул и "
+        "используется повторно."
+    )
+    stats = connection.pool.snapshot()
+    assert (stats["opened"], stats["reused"]) == (1, 1)
+
+
+def test_broken_connection_not_reused(make_connection):
+    connection = make_connection()
+    query(connection)
+    connection.errors_occurred = True
+    connection.close()
+    assert connection.pool.snapshot()["idle"] == 0, (
+        "Убедитесь, что соединение с ошибками не возвращается в пул."
+    )
+
+
+def test_health_check_drops_dead_connection(make_connection):
+    connection = make_connection(HEALTH_CHECK_AFTER=0)
+    query(connection)
+    raw = connection.connection
+    connection.close()
+    raw.close()
+    query(connection)
+    assert connection.connection is not raw, (
+        "Убедитесь, что перед выдачей из пула соединение проверяется."
+    )
+    assert connection.pool.snapshot()["failed_checks"] == 1
+
+
+def test_pool_keeps_at_most_size_connections(make_connection):
+    first, second = make_connection(), make_connection()
+    query(first)
+    query(second)
+    first.close()
+    second.close()
+    stats = first.pool.snapshot()
+    assert (stats["idle"], stats["discarded"]) == (1, 1), (
+        "Убедитесь, что в пуле остаётся не больше `SIZE` соединений."
+    )
+
+
+def test_connection_not_reused_for_another_database(
+        make_connection, tmp_path
+):
+    connection = make_connection()
+    query(connection)
+    raw = connection.connection
+    connection.close()
+    connection.settings_dict["NAME"] = tmp_path / "other.sqlite3"
+    query(connection)
+    assert connection.connection is not raw, (
+        "Убедитесь, что после смены базы данных соединения из пула "
+        "не используются."
+    )
+    assert connection.pool.snapshot()["opened"] == 1
+
+
+def test_connection_opened_before_switch_not_pooled(make_connection, tmp_path):
+    connection = make_connection()
+    query(connection)
+    stale = connection.pool
+    connection.settings_dict["NAME"] = tmp_path / "other.sqlite3"
+    connection.close()
+    assert connection.pool.snapshot()["idle"] == 0, (
+        "Убедитесь, что соединение со старой базой не возвращается в пул."
+    )
+    assert stale.snapshot()["discarded"] == 1
+
+
+@pytest.mark.django_db
+def test_stats_view_reports_pools(admin_client):
+    response = admin_client.get(reverse("request_stats"))
+    assert "db_pools" in response.json(), (
+        "Убедитесь, что статистика пулов соединений доступна на странице "
+        "статистики запросов."
+    )
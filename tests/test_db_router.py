@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog.models import Post
+from blogicum.routers import (
+    PIN_COOKIE,
+    ReplicaRouter,
+    allow_replicas,
+    pin_to_primary,
+)
+
+REPLICA_DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3"},
+    "replica_1": {"ENGINE": "django.db.backends.sqlite3"},
+    "replica_2": {"ENGINE": "django.db.backends.sqlite3"},
+}
+
+
+def test_router_reads_blog_models_from_replicas(settings):
+    settings.DATABASES = REPLICA_DATABASES
+    router = ReplicaRouter()
+    with allow_replicas():
+        assert router.db_for_read(Post) in ("replica_1", "replica_2")
+        assert router.db_for_read(get_user_model()) is None
+        assert router.db_for_write(Post) == "default"
+        with pin_to_primary():
+            assert router.db_for_read(Post) == "default", (
+                "Убедитесь, что закреплённые за основной базой запросы не "
+                "читают из реплик."
+            )
+
+
+def test_reads_outside_requests_use_primary(settings):
+    settings.DATABASES = REPLICA_DATABASES
+    assert ReplicaRouter().db_for_read(Post) == "default", (
+        "Убедитесь, что вне запроса (в командах, shell, фоновых задачах) "
+        "чтение идёт из основной базы."
+    )
+
+
+def test_router_without_replicas():
+    assert ReplicaRouter().db_for_read(Post) == "default"
+
+
+@pytest.mark.django_db
+def test_write_pins_client_to_primary(
+    user_client, post_with_published_location
+):
+    response = user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        {"text": "Комментарий"},
+    )
+    assert PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после записи клиент на время закрепляется за"
+        " основной базой данных."
+    )
+    assert user_client.get("/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_command_with_replica_configured(stale_replica):
+    call_command(
+        "generate_blog_data",
+        users=3, categories=2, locations=2, posts=10, comments=10,
+        verbosity=0,
+    )
+    assert Post.objects.count() == 10, (
+        "Убедитесь, что управляющие команды читают свои записи из основной "
+        "базы, а не из отстающей реплики."
+    )
@@ -0,0 +1,107 @@
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    return post_with_published_location
+
+
+@pytest.mark.parametrize(
+    "name, args",
+    [
+        ("blog:feed_rss", lambda post: []),
+        ("blog:feed_atom", lambda post: []),
+        ("blog:category_feed_rss", lambda post: [post.category.slug]),
+        ("blog:category_feed_atom", lambda post: [post.category.slug]),
+        ("blog:profile_feed_rss", lambda post: [post.author.username]),
+        ("blog:profile_feed_atom", lambda post: [post.author.username]),
+    ],
+)
+def test_feed_lists_visible_posts(client, post, name, args):
+    url = reverse(name, args=args(post))
+    response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что лента `{url}` доступна анонимному пользователю."
+    )
+    assert post.title in response.content.decode(), (
+        f"Убедитесь, что в ленту `{url}` попадают опубликованные посты."
+    )
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), f"Убедитесь, что лента `{url}` отдаёт заголовки ETag и Last-Modified."
+
+
+def test_feed_answers_not_modified(client, post):
+    url = reverse("blog:feed_rss")
+    response = client.get(url)
+    for headers in (
+        {"HTTP_IF_NONE_MATCH": response["ETag"]},
+        {"HTTP_IF_MODIFIED_SINCE": response["Last-Modified"]},
+    ):
+        assert client.get(url, **headers).status_code == 304, (
+            "Убедитесь, что лента отвечает 304 Not Modified на условный "
+            "запрос, если она не изменилась."
+        )
+
+
+def test_feed_rebuilt_after_post_change(client, post):
+    url = reverse("blog:feed_rss")
+    etag = client.get(url)["ETag"]
+    post.title = "Исправленный заголовок"
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после изменения поста лента отдаётся заново, "
+        "а не как 304 Not Modified."
+    )
+    assert "Исправленный заголовок" in response.content.decode(), (
+        "Убедитесь, что закешированная лента обновляется при изменении "
+        "поста."
+    )
+
+
+@pytest.mark.parametrize(
+    "name, args",
+    [
+        ("blog:feed_rss", lambda post: []),
+        ("blog:feed_atom", lambda post: []),
+        ("blog:category_feed_atom", lambda post: [post.category.slug]),
+    ],
+)
+def test_feed_rebuilt_after_author_rename(client, post, name, args):
+    url = reverse(name, args=args(post))
+    client.get(url)
+    author = post.author
+    author.first_name, author.last_name = "Переименованный", "Автор"
+    author.save()
+    assert "Переименованный Автор" in client.get(url).content.decode(), (
+        f"Убедитесь, что закешированная лента `{url}` обновляется, когда "
+        "автор одного из постов меняет имя."
+    )
+
+
+def test_feed_cached_per_host_and_scheme(client, post):
+    url = reverse("blog:feed_rss")
+    client.get(url, HTTP_HOST="localhost")
+    for host, secure, link in (
+        ("127.0.0.1", False, "http://127.0.0.1/"),
+        ("localhost", True, "https://localhost/"),
+    ):
+        content = client.get(url, HTTP_HOST=host, secure=secure).content
+        assert link in content.decode(), (
+            "Убедитесь, что ссылки закешированной ленты соответствуют "
+            "схеме и хосту запроса."
+        )
+
+
+def test_feed_of_hidden_category_not_found(client, post):
+    category = post.category
+    category.is_published = False
+    category.save()
+    url = reverse("blog:category_feed_rss", args=[category.slug])
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что лента снятой с публикации категории возвращает 404."
+    )
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Follow
+from blog.timelines import fan_out_post, home_timeline
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def follow(user, another_user):
+    return Follow.objects.create(follower=another_user, author=user)
+
+
+def blend_post(mixer, author, category, location):
+    return mixer.blend(
+        "blog.Post", author=author, category=category, location=location
+    )
+
+
+def test_follow_and_unfollow(another_user_client, another_user, user):
+    url = reverse("blog:profile", args=[user.username])
+    assert "Подписаться" in another_user_client.get(url).content.decode(), (
+        "Убедитесь, что на странице чужого профиля есть кнопка подписки."
+    )
+    another_user_client.post(reverse("blog:follow", args=[user.username]))
+    assert Follow.objects.filter(
+        follower=another_user, author=user
+    ).exists(), "Убедитесь, что POST-запрос к `follow/` создаёт подписку."
+    assert "Отписаться" in another_user_client.get(url).content.decode(), (
+        "Убедитесь, что подписчик видит в профиле автора кнопку отписки."
+    )
+    another_user_client.post(reverse("blog:unfollow", args=[user.username]))
+    assert not Follow.objects.exists(), (
+        "Убедитесь, что POST-запрос к `unfollow/` удаляет подписку."
+    )
+
+
+def test_cannot_follow_self(user_client, user):
+    user_client.post(reverse("blog:follow", args=[user.username]))
+    assert not Follow.objects.exists(), (
+        "Убедитесь, что пользователь не может подписаться на самого себя."
+    )
+
+
+def test_home_feed_requires_login(client):
+    response = client.get(reverse("blog:home"))
+    assert response.status_code == 302, (
+        "Убедитесь, что анонимный пользователь перенаправляется со страницы "
+        "подписок на страницу входа."
+    )
+
+
+def test_home_feed_lists_followed_authors(
+    mixer, another_user_client, follow, post_with_published_location,
+):
+    post = post_with_published_location
+    stranger = mixer.blend("auth.User")
+    other = blend_post(mixer, stranger, post.category, post.location)
+    response = another_user_client.get(reverse("blog:home"))
+    posts = list(response.context["page_obj"])
+    assert posts == [post], (
+        "Убедитесь, что на странице подписок показаны публикации только тех "
+        "авторов, на которых подписан пользователь."
+    )
+    assert other not in posts
+
+
+def test_new_post_fanned_out_to_cached_timeline(
+    mixer, settings, django_capture_on_commit_callbacks, another_user,
+    follow, post_with_published_location,
+):
+    settings.JOBS_EXECUTOR = "eager"
+    post = post_with_published_location
+    home_timeline(another_user.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        new_post = blend_post(mixer, post.author, post.category, post.location)
+    with CaptureQueriesContext(connection) as queries:
+        ids = [pk for _, pk in home_timeline(another_user.pk)]
+    assert new_post.pk in ids, (
+        "Убедитесь, что новая публикация попадает в закешированные ленты "
+        "подписчиков автора."
+    )
+    assert not queries.captured_queries, (
+        "Убедитесь, что лента подписок читается из кеша без запросов к БД."
+    )
+
+
+def test_celebrity_posts_merged_on_read(
+    monkeypatch, another_user, follow, post_with_published_location,
+):
+    monkeypatch.setattr("blog.timelines.CELEBRITY_FOLLOWERS", 0)
+    post = post_with_published_location
+    home_timeline(another_user.pk)
+    assert fan_out_post(post.pk) == 0, (
+        "Убедитесь, что публикации популярных авторов не рассылаются по "
+        "лентам подписчиков."
+    )
+    assert [pk for _, pk in home_timeline(another_user.pk)] == [post.pk], (
+        "Убедитесь, что публикации популярных авторов добавляются в ленту "
+        "подписок при её чтении."
+    )
@@ -0,0 +1,90 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template import Context, Template
+
+from blog.images import derivative_name, generate_derivatives
+from blog.models import Post
+
+
+def save_image(name, image_format="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", (1500, 1000), color=(73, 109, 137)).save(
+        buffer, format=image_format
+    )
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+@pytest.fixture
+def stored_image(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return save_image("img/photo.png")
+
+
+def test_generate_derivatives(stored_image):
+    created = generate_derivatives(stored_image)
+    assert sorted(created) == sorted([
+        derivative_name(stored_image, size, image_format)
+        for size in ("card", "detail")
+        for image_format in ("jpeg", "webp")
+    ]), (
+        "Убедитесь, что для изображения создаются уменьшенные копии в JPEG"
+        " и WebP, и что изображение не увеличивается."
+    )
+    card = derivative_name(stored_image, "card", "webp")
+    with default_storage.open(card) as image_file:
+        assert Image.open(image_file).size == (640, 427)
+
+
+def test_post_image_tag_srcset(stored_image):
+    generate_derivatives(stored_image)
+    html = Template(
+        '{% load blog_tags %}{% post_image image "card" %}'
+    ).render(Context({"image": Post(image=stored_image).image}))
+    assert 'type="image/webp"' in html
+    assert "photo.png.card.webp 640w" in html
+    assert "photo.png.detail.jpg 1280w" in html
+    assert html.count("<img") == 1
+
+
+def test_same_stem_images_get_own_derivatives(stored_image):
+    other = save_image("img/photo.jpg", "JPEG")
+    created = generate_derivatives(stored_image)
+    other_created = generate_derivatives(other)
+    assert not set(created) & set(other_created), (
+        "Убедитесь, что у изображений с одинаковым именем и разными "
+        "расширениями свои уменьшенные копии."
+    )
+    assert all(default_storage.exists(name) for name in created)
+
+
+@pytest.mark.django_db
+def test_derivatives_removed_with_image(
+    stored_image, settings, django_capture_on_commit_callbacks,
+    post_with_published_location
+):
+    settings.JOBS_EXECUTOR = "eager"
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(image=stored_image)
+    post.refresh_from_db()
+    created = generate_derivatives(stored_image)
+    replacement = save_image("img/other.png")
+    generate_derivatives(replacement)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = replacement
+        post.save()
+    assert not any(default_storage.exists(name) for name in created), (
+        "Убедитесь, что уменьшенные копии заменённого изображения "
+        "удаляются."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not default_storage.exists(
+        derivative_name(replacement, "card", "webp")
+    ), (
+        "Убедитесь, что уменьшенные копии изображения удаляются вместе "
+        "с публикацией."
+    )
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job, task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task()
+def record(value):
+    calls.append(value)
+
+
+@task(priority=5)
+def urgent():
+    pass
+
+
+@task(max_attempts=2)
+def broken():
+    raise RuntimeError("сбой")
+
+
+@pytest.fixture(autouse=True)
+def worker_only(settings):
+    settings.JOBS_EXECUTOR = "worker"
+    calls.clear()
+
+
+def test_eager_job_runs_on_commit(
+    settings, django_capture_on_commit_callbacks
+):
+    settings.JOBS_EXECUTOR = "eager"
+    with django_capture_on_commit_callbacks(execute=True):
+        job = record.delay(1)
+        assert not calls, (
+            "Убедитесь, что задача выполняется только после фиксации "
+            "транзакции."
+        )
+    assert calls == [1], "Убедитесь, что задача выполняется с аргументами."
+    assert not Job.objects.filter(pk=job.pk).exists(), (
+        "Убедитесь, что выполненная задача удаляется из очереди."
+    )
+
+
+def test_failed_job_retried_with_backoff():
+    job = broken.delay()
+    assert not run_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED and job.run_after > timezone.now(), (
+        "Убедитесь, что после ошибки задача возвращается в очередь "
+        "с задержкой."
+    )
+    assert "сбой" in job.last_error
+    assert not run_job(job.pk), (
+        "Убедитесь, что задача не выполняется раньше `run_after`."
+    )
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    run_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == Job.FAILED and job.attempts == 2, (
+        "Убедитесь, что после `max_attempts` попыток задача помечается "
+        "как невыполненная."
+    )
+
+
+def test_claim_order_and_due_time():
+    later = record.delay(1)
+    Job.objects.filter(pk=later.pk).update(
+        run_after=timezone.now() + timedelta(hours=1)
+    )
+    normal = record.delay(2)
+    important = urgent.delay()
+    assert claim_jobs(10) == [important.pk, normal.pk], (
+        "Убедитесь, что задачи берутся в порядке приоритета, а отложенные "
+        "не берутся раньше срока."
+    )
+    assert claim_jobs(10) == [], "Убедитесь, что задача берётся один раз."
+
+
+def test_abandoned_job_taken_again():
+    job = record.delay(1)
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.RUNNING, locked_at=timezone.now() - timedelta(days=1)
+    )
+    assert claim_jobs(10) == [job.pk], (
+        "Убедитесь, что задача, исполнитель которой не завершил её, "
+        "снова берётся в работу."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_jobs_command_drains_queue():
+    record.delay(1)
+    record.delay(2)
+    call_command("run_jobs", "--once")
+    assert sorted(calls) == [1, 2], (
+        "Убедитесь, что команда `run_jobs --once` выполняет задачи "
+        "из очереди."
+    )
+    assert not Job.objects.exists()
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer, user, published_category):
+    # Половина публикаций делит одну дату, чтобы проверить сортировку по id.
+    now = timezone.now()
+    dates = [
+        now - timedelta(days=1 + i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    ]
+    return mixer.cycle(len(dates)).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(date for date in dates),
+    )
+
+
+def _walk_pages(client, url, direction="after"):
+    seen = []
+    response = client.get(url)
+    assert response.status_code == 200
+    while True:
+        page = response.context["page_obj"]
+        seen.extend(post.id for post in page)
+        cursor = page.next_cursor
+        if cursor is None:
+            return seen, page
+        response = client.get(url, {direction: cursor})
+        assert response.status_code == 200
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_keyset_pages_cover_feed(
+    url_name, user_client, user, published_category, posts_with_equal_dates
+):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    seen, last_page = _walk_pages(user_client, url)
+    expected = [
+        post.id for post in sorted(
+            posts_with_equal_dates,
+            key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+    assert seen == expected, (
+        "Убедитесь, что курсорная пагинация обходит все публикации ровно"
+        " один раз в порядке «от новых к старым»."
+    )
+
+    response = user_client.get(url, {"before": last_page.previous_cursor})
+    previous_ids = [post.id for post in response.context["page_obj"]]
+    assert previous_ids == expected[-N_PER_PAGE - 5:-5], (
+        "Убедитесь, что ссылка на предыдущую страницу возвращает"
+        " предыдущие публикации."
+    )
+
+
+def test_keyset_skips_count(user_client, posts_with_equal_dates):
+    response = user_client.get("/")
+    paginator = response.context["page_obj"].paginator
+    assert "count" not in paginator.__dict__, (
+        "Убедитесь, что курсорная пагинация не выполняет COUNT(*),"
+        " если шаблон не запрашивает общее число публикаций."
+    )
+    assert paginator.count == len(posts_with_equal_dates)
+
+
+def test_invalid_cursor_is_404(user_client):
+    response = user_client.get("/", {"after": "not-a-cursor"})
+    assert response.status_code == 404
+
+
+def test_legacy_page_links(user_client, posts_with_equal_dates):
+    response = user_client.get("/", {"page": 2})
+    assert response.status_code == 200
+    assert len(response.context["page_obj"]) == N_PER_PAGE
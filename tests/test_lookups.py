@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.lookups import categories, locations, published_category_by_slug
+from blog.mixins import VisiblePostsMixin
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_query_skips_lookup_joins(post_with_published_location):
+    categories.rows()
+    locations.rows()
+    with CaptureQueriesContext(connection) as queries:
+        posts = list(VisiblePostsMixin.visible_posts_queryset())
+        assert posts[0].category.title
+        assert posts[0].location.name
+    assert len(queries) == 1, (
+        "Убедитесь, что категории и местоположения публикаций берутся "
+        "из таблиц в памяти процесса без дополнительных запросов."
+    )
+    sql = queries[0]["sql"]
+    assert "blog_category" not in sql and "blog_location" not in sql, (
+        "Убедитесь, что запрос ленты не соединяется с таблицами категорий "
+        "и местоположений."
+    )
+
+
+def test_lookup_table_follows_changes(client, post_with_published_location):
+    category = post_with_published_location.category
+    assert published_category_by_slug(category.slug) == category
+    category.title = "Новое название"
+    category.save()
+    assert categories.get(category.pk).title == "Новое название", (
+        "Убедитесь, что таблица категорий перечитывается после изменения "
+        "категории."
+    )
+    category.is_published = False
+    category.save()
+    assert published_category_by_slug(category.slug) is None
+    url = reverse("blog:category_posts", args=[category.slug])
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что страница снятой с публикации категории "
+        "возвращает 404."
+    )
@@ -0,0 +1,93 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    return post_with_published_location
+
+
+def refreshed(post):
+    return Post.objects.get(pk=post.pk)
+
+
+def test_save_tracks_changes(post):
+    updated_at, version = post.updated_at, post.content_version
+    post.title = "Новый заголовок"
+    post.save()
+    post = refreshed(post)
+    assert post.updated_at > updated_at, (
+        "Убедитесь, что при сохранении поста обновляется поле `updated_at`."
+    )
+    assert post.content_version > version, (
+        "Убедитесь, что при сохранении поста растёт `content_version`."
+    )
+
+
+def test_bulk_operations_track_changes(post, published_category):
+    updated_at, version = post.updated_at, post.content_version
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    post = refreshed(post)
+    assert post.updated_at > updated_at and post.content_version > version, (
+        "Убедитесь, что `QuerySet.update()` обновляет `updated_at` "
+        "и `content_version` постов."
+    )
+    version = post.content_version
+    post.title = "Новый заголовок"
+    Post.objects.bulk_update([post], ["title"])
+    assert refreshed(post).content_version > version, (
+        "Убедитесь, что `bulk_update()` увеличивает `content_version`."
+    )
+    category_updated_at = published_category.updated_at
+    Category.objects.filter(pk=published_category.pk).update(title="Другая")
+    published_category.refresh_from_db()
+    assert published_category.updated_at > category_updated_at, (
+        "Убедитесь, что `QuerySet.update()` обновляет `updated_at` "
+        "категорий."
+    )
+
+
+def test_comment_changes_bump_post_version(post, mixer):
+    version = post.content_version
+    comment = mixer.blend("blog.Comment", post=post)
+    assert refreshed(post).content_version > version, (
+        "Убедитесь, что новый комментарий увеличивает `content_version` "
+        "поста."
+    )
+    version = refreshed(post).content_version
+    comment.text = "Исправленный комментарий"
+    comment.save()
+    assert refreshed(post).content_version > version, (
+        "Убедитесь, что изменение комментария увеличивает "
+        "`content_version` поста."
+    )
+    version = refreshed(post).content_version
+    comment.delete()
+    assert refreshed(post).content_version > version, (
+        "Убедитесь, что удаление комментария увеличивает "
+        "`content_version` поста."
+    )
+
+
+def test_saving_stale_post_keeps_version_growing(post, mixer):
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    version = refreshed(post).content_version
+    post.title = "Новый заголовок"
+    post.save()
+    assert refreshed(post).content_version == version + 1, (
+        "Убедитесь, что сохранение поста, загруженного до изменения "
+        "комментариев, не уменьшает `content_version`."
+    )
+    assert post.content_version == version + 1
+
+
+def test_bundled_fixture_loads(settings):
+    call_command("loaddata", settings.BASE_DIR / "db.json", verbosity=0)
+    assert Post.objects.filter(updated_at__isnull=False).count() == 39, (
+        "Убедитесь, что фикстура `db.json` загружается вместе "
+        "с полем `updated_at`."
+    )
@@ -0,0 +1,180 @@
+import socketserver
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from outbox import delivery
+from outbox.delivery import pool, send_outbox
+from outbox.mail import queue_mail
+from outbox.models import OutboxMessage
+from outbox.tasks import deliver_outbox
+
+pytestmark = [pytest.mark.django_db]
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages from smtplib."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stub")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 bye")
+                return
+            if command == "DATA":
+                self.reply("354 go on")
+                lines = []
+                for data in iter(self.rfile.readline, b""):
+                    if data == b".\r\n":
+                        break
+                    lines.append(data.decode())
+                self.server.messages.append("".join(lines))
+            self.reply("250 ok")
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPStubHandler)
+        self.connections = 0
+        self.messages = []
+
+
+@pytest.fixture
+def smtp_stub(settings):
+    server = SMTPStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    yield server
+    pool.discard()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def worker_only(settings):
+    settings.JOBS_EXECUTOR = "worker"
+
+
+def test_password_reset_queues_mail(client, mailoutbox):
+    user = get_user_model().objects.create_user(
+        "reader", "reader@example.com", "password"
+    )
+    response = client.post(
+        reverse("password_reset"), {"email": user.email}
+    )
+    assert response.status_code == 302
+    assert not mailoutbox, (
+        "Убедитесь, что письмо для сброса пароля не отправляется во время "
+        "запроса."
+    )
+    message = OutboxMessage.objects.get()
+    assert message.to == [user.email] and "reset" in message.body, (
+        "Убедитесь, что письмо для сброса пароля попадает в очередь "
+        "исходящей почты."
+    )
+
+
+def test_registration_queues_welcome_mail(client, mailoutbox):
+    response = client.post(
+        reverse("registration"),
+        {
+            "username": "newcomer",
+            "email": "newcomer@example.com",
+            "password1": "Kx8#mq2!vLp",
+            "password2": "Kx8#mq2!vLp",
+        },
+    )
+    assert response.status_code == 302
+    assert not mailoutbox
+    message = OutboxMessage.objects.get()
+    assert message.to == ["newcomer@example.com"], (
+        "Убедитесь, что при регистрации письмо попадает в очередь "
+        "исходящей почты."
+    )
+    assert "newcomer" in message.body and "/auth/login/" in message.body
+
+
+def test_job_closes_connection(smtp_stub):
+    queue_mail("Письмо", "Текст", ["user@example.com"])
+    deliver_outbox()
+    assert len(smtp_stub.messages) == 1
+    assert getattr(pool._local, "connection", None) is None, (
+        "Убедитесь, что фоновая задача закрывает SMTP-соединение "
+        "после отправки."
+    )
+
+
+def test_batches_share_one_connection(smtp_stub):
+    for index in range(3):
+        queue_mail(f"Письмо {index}", "Текст", [f"user{index}@example.com"])
+    assert send_outbox(batch_size=2) == 3
+    queue_mail("Ещё письмо", "Текст", ["late@example.com"])
+    assert send_outbox() == 1
+    assert len(smtp_stub.messages) == 4, (
+        "Убедитесь, что все письма из очереди доставляются по SMTP."
+    )
+    assert smtp_stub.connections == 1, (
+        "Убедитесь, что письма отправляются через одно переиспользуемое "
+        "SMTP-соединение."
+    )
+    assert not OutboxMessage.objects.exclude(status=OutboxMessage.SENT)
+
+
+def test_failed_delivery_retried(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = "127.0.0.1", 1
+    message = queue_mail("Письмо", "Текст", ["user@example.com"])
+    try:
+        assert send_outbox() == 0
+    finally:
+        pool.discard()
+    message.refresh_from_db()
+    assert message.status == OutboxMessage.PENDING and message.last_error, (
+        "Убедитесь, что неотправленное письмо остаётся в очереди для "
+        "повторной попытки."
+    )
+    assert send_outbox() == 0, (
+        "Убедитесь, что повторная попытка откладывается."
+    )
+
+
+def test_rate_limit(monkeypatch, mailoutbox):
+    class Clock:
+        now = 1000.0
+        sleeps = []
+
+        def time(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        def monotonic(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(delivery, "time", clock)
+    monkeypatch.setattr(delivery, "OUTBOX_RATE_LIMIT", 2)
+    for index in range(5):
+        queue_mail(f"Письмо {index}", "Текст", ["user@example.com"])
+    assert send_outbox() == 5
+    pool.discard()
+    assert len(mailoutbox) == 5
+    assert len(clock.sleeps) == 2, (
+        "Убедитесь, что за секунду отправляется не больше "
+        "`OUTBOX_RATE_LIMIT` писем."
+    )
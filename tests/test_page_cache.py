@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.models import Post
+from blog.publishing import refresh_next_pub_date
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_hit_skips_database(
+    unlogged_client, post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    for url in ("/", f"/category/{post.category.slug}/", f"/posts/{post.id}/"):
+        first = unlogged_client.get(url)
+        with django_assert_num_queries(0):
+            second = unlogged_client.get(url)
+        assert second.content == first.content, (
+            "Убедитесь, что анонимные запросы к лентам и странице публикации"
+            " обслуживаются из кеша страниц."
+        )
+
+
+def test_logged_in_users_bypass_cache(
+    user_client, post_with_published_location
+):
+    user_client.get("/")
+    assert not [key for key in cache._cache if "blog:page:" in key]
+
+
+def test_page_purged_on_change(
+    mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    unlogged_client.get("/")
+    unlogged_client.get(f"/posts/{post.id}/")
+    mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    post.title = "Обновлённый заголовок"
+    post.save()
+    assert post.title in unlogged_client.get("/").content.decode("utf-8")
+    assert "Свежий комментарий" in (
+        unlogged_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    )
+
+
+@pytest.mark.parametrize("prefix", ["", "/async"])
+def test_post_page_purged_on_commenter_rename(
+    mixer, unlogged_client, post_with_published_location, another_user,
+    prefix,
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    unlogged_client.get(f"{prefix}/posts/{post.id}/")
+    another_user.username = "renamed_commenter"
+    another_user.save()
+    assert "renamed_commenter" in (
+        unlogged_client.get(f"{prefix}/posts/{post.id}/").content.decode()
+    ), (
+        "Убедитесь, что страница публикации в кеше обновляется, когда"
+        " автор комментария меняет имя."
+    )
+
+
+@pytest.mark.parametrize("prefix", ["", "/async"])
+def test_cache_hit_keeps_headers(
+    unlogged_client, post_with_published_location, prefix
+):
+    url = f"{prefix}/posts/{post_with_published_location.id}/"
+    first = unlogged_client.get(url)
+    second = unlogged_client.get(url)
+    assert "Cookie" in second.get("Vary", ""), (
+        "Убедитесь, что страница из кеша отдаётся с заголовком Vary: Cookie."
+    )
+    assert second.get("Last-Modified") == first.get("Last-Modified"), (
+        "Убедитесь, что страница из кеша отдаётся с валидаторами."
+    )
+
+
+def test_feed_updated_when_scheduled_post_goes_live(
+    mixer, unlogged_client, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    assert post.title not in unlogged_client.get("/").content.decode()
+    # The pub_date comes, with the page still in the cache, and a job
+    # worker with a cache of its own publishes the post.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1), is_live=False
+    )
+    refresh_next_pub_date()
+    Post.objects.filter(pk=post.pk).update(is_live=True)
+    assert post.title in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что отложенная публикация появляется в закешированной"
+        " ленте, как только наступает её время."
+    )
@@ -0,0 +1,46 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _card_keys():
+    return [key for key in cache._cache if "blog:post_card:" in key]
+
+
+def test_card_rendered_once(user_client, post_with_published_location):
+    user_client.get("/")
+    keys = _card_keys()
+    assert len(keys) == 1, (
+        "Убедитесь, что карточка публикации сохраняется в кеш фрагментов."
+    )
+    user_client.get("/")
+    assert _card_keys() == keys
+
+
+@pytest.mark.parametrize("change", ["comment", "category", "location", "post"])
+def test_card_invalidated(
+    change, mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    if change == "comment":
+        mixer.blend("blog.Comment", post=post)
+        expected = "Комментарии (1)"
+    elif change == "category":
+        post.category.title = "Новое название категории"
+        post.category.save()
+        expected = post.category.title
+    elif change == "location":
+        post.location.name = "Новое место"
+        post.location.save()
+        expected = post.location.name
+    else:
+        post.title = "Новый заголовок"
+        post.save()
+        expected = post.title
+    content = user_client.get("/").content.decode("utf-8")
+    assert expected in content, (
+        "Убедитесь, что кеш карточки публикации сбрасывается при изменении"
+        " публикации, её категории, местоположения и комментариев."
+    )
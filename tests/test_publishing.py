@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.cache import FEED_TAG, get_versions
+from blog.mixins import VisiblePostsMixin
+from blog.models import Post
+from jobs.models import Job
+from blog.publishing import (
+    publish_due_posts,
+    refresh_next_pub_date,
+    refresh_published_caches,
+)
+from blogicum.routers import allow_replicas
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+def visible_ids():
+    return set(
+        VisiblePostsMixin.visible_posts_queryset()
+        .values_list("pk", flat=True)
+    )
+
+
+def test_save_sets_is_live(scheduled_post):
+    assert not scheduled_post.is_live, (
+        "Убедитесь, что отложенная публикация сохраняется с `is_live=False`."
+    )
+    scheduled_post.pub_date = timezone.now() - timedelta(minutes=1)
+    scheduled_post.save()
+    assert Post.objects.get(pk=scheduled_post.pk).is_live, (
+        "Убедитесь, что публикация с наступившей датой сохраняется "
+        "с `is_live=True`."
+    )
+
+
+def test_command_publishes_due_posts(scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1), is_live=False
+    )
+    assert scheduled_post.pk not in visible_ids(), (
+        "Убедитесь, что ленты отбирают публикации по полю `is_live`."
+    )
+    call_command("publish_scheduled_posts", stdout=None)
+    assert scheduled_post.pk in visible_ids(), (
+        "Убедитесь, что команда `publish_scheduled_posts` выпускает "
+        "публикации, время которых наступило."
+    )
+
+
+def test_publish_with_stale_replica(scheduled_post, stale_replica):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1), is_live=False
+    )
+    with allow_replicas():
+        published = publish_due_posts()
+    assert published == 1, (
+        "Убедитесь, что `publish_due_posts()` читает отложенные публикации "
+        "из основной базы, а не из реплики."
+    )
+
+
+def test_posts_published_elsewhere_invalidate_caches(scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1), is_live=False
+    )
+    refresh_next_pub_date()
+    # Another process publishes the post and bumps the tags of its own
+    # cache only.
+    Post.objects.filter(pk=scheduled_post.pk).update(is_live=True)
+    versions = get_versions([FEED_TAG])
+    assert refresh_published_caches() == 1
+    assert get_versions([FEED_TAG]) != versions, (
+        "Убедитесь, что кеши лент сбрасываются, когда отложенную публикацию "
+        "выпустил другой процесс."
+    )
+
+
+def test_deferred_post_schedules_publishing(scheduled_post):
+    job = Job.objects.get(name="blog.tasks.publish_scheduled_posts")
+    assert job.run_after == scheduled_post.pub_date, (
+        "Убедитесь, что отложенная публикация ставит в очередь задачу "
+        "выпуска на дату публикации."
+    )
+
+
+def test_requests_do_not_publish(client, scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1), is_live=False
+    )
+    refresh_next_pub_date()
+    assert client.get("/").status_code == 200
+    assert not Post.objects.get(pk=scheduled_post.pk).is_live, (
+        "Убедитесь, что отложенные публикации выпускаются вне цикла "
+        "запроса."
+    )
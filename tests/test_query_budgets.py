@@ -0,0 +1,51 @@
+import pytest
+from django.urls import reverse
+
+from blog.lookups import categories, locations
+from blogicum.instrumentation import request_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def strict_budgets(settings):
+    settings.QUERY_BUDGET_STRICT = True
+    request_stats.reset()
+
+
+@pytest.fixture
+def pages(
+    user, post_with_published_location, many_posts_with_published_locations,
+    mixer
+):
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post)
+    # Budgets describe a warm process: lookup tables are loaded only once.
+    categories.rows()
+    locations.rows()
+    return [
+        reverse("blog:index"),
+        reverse("blog:category_posts", args=[post.category.slug]),
+        reverse("blog:profile", args=[user.username]),
+        reverse("blog:post_detail", args=[post.id]),
+        reverse("blog:comments", args=[post.id]),
+        reverse("blog:search") + "?q=test",
+    ]
+
+
+@pytest.mark.parametrize("client_name", ["user_client", "unlogged_client"])
+def test_views_within_query_budgets(request, client_name, pages):
+    client = request.getfixturevalue(client_name)
+    for url in pages:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert "db;dur=" in response["Server-Timing"], (
+            "Убедитесь, что ответы содержат заголовок Server-Timing."
+        )
+
+
+def test_stats_endpoint(admin_client, client, pages):
+    client.get(pages[0])
+    stats = admin_client.get("/stats/requests/").json()["views"]
+    assert stats["blog:index"]["requests"] == 1
+    assert client.get("/stats/requests/").status_code == 302
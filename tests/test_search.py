@@ -0,0 +1,70 @@
+import pytest
+
+from blog.search import stem
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("публикации", "публикац"),
+        ("публикациями", "публикац"),
+        ("красивыми", "красив"),
+        ("путешествовать", "путешествова"),
+        ("знаменитость", "знаменит"),
+    ],
+)
+def test_russian_stemmer(word, expected):
+    assert stem(word) == expected
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    return {
+        "cats": mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=True, title="Кошки и собаки",
+            text="Рассказ о домашних животных.",
+        ),
+        "travel": mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=True, title="Путешествие на море",
+            text="Мы долго путешествовали по побережью.",
+        ),
+        "hidden": mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=False, title="Скрытое путешествие",
+            text="Этот пост снят с публикации.",
+        ),
+    }
+
+
+def _found(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_by_word_forms(client, searchable_posts):
+    assert _found(client, "кошками") == [searchable_posts["cats"].id], (
+        "Убедитесь, что поиск находит публикации по другим формам слова."
+    )
+    assert _found(client, "путешествий") == [searchable_posts["travel"].id], (
+        "Убедитесь, что поиск не показывает снятые с публикации посты."
+    )
+
+
+def test_search_comments_and_updates(mixer, client, searchable_posts):
+    post = searchable_posts["cats"]
+    comment = mixer.blend("blog.Comment", post=post, text="Отличные котята")
+    assert _found(client, "котятами") == [post.id], (
+        "Убедитесь, что поиск учитывает текст комментариев."
+    )
+    comment.delete()
+    assert _found(client, "котятами") == []
+
+    post.title = "Попугаи"
+    post.save()
+    assert _found(client, "попугай") == [post.id]
+    assert _found(client, "кошки") == []
@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from blog.lookups import locations
+from blog.paginators import TimelinePaginator
+from blog.timelines import author_posts, author_timeline, timeline_page
+
+pytestmark = [pytest.mark.django_db]
+
+
+def walk(author_id, owner, page_size=4):
+    """Ids of every timeline page, following the next cursors."""
+    ids, query = [], ""
+    while True:
+        request = RequestFactory().get(f"/{query}")
+        page = timeline_page(request, author_id, owner, page_size)
+        ids += [post.pk for post in page]
+        if not page.has_next():
+            return ids
+        query = f"?after={page.next_cursor}"
+
+
+@pytest.mark.parametrize("owner", [True, False])
+def test_timeline_pages_match_queryset(
+    user, many_posts_with_published_locations,
+    unpublished_posts_with_published_locations, owner
+):
+    expected = list(
+        author_posts(user.pk, owner)
+        .order_by("-pub_date", "-id")
+        .values_list("pk", flat=True)
+    )
+    assert walk(user.pk, owner) == expected, (
+        "Убедитесь, что страницы ленты автора содержат те же публикации "
+        "и в том же порядке, что и запрос к базе."
+    )
+
+
+def test_previous_page_cursor(user, many_posts_with_published_locations):
+    first = timeline_page(RequestFactory().get("/"), user.pk, False, 4)
+    second = timeline_page(
+        RequestFactory().get(f"/?after={first.next_cursor}"),
+        user.pk, False, 4,
+    )
+    back = timeline_page(
+        RequestFactory().get(f"/?before={second.previous_cursor}"),
+        user.pk, False, 4,
+    )
+    assert [post.pk for post in back] == [post.pk for post in first], (
+        "Убедитесь, что ссылка на предыдущую страницу ленты автора "
+        "возвращает к первой странице."
+    )
+
+
+def test_warm_timeline_loads_only_page(
+    user, many_posts_with_published_locations
+):
+    author_timeline(user.pk)
+    locations.rows()
+    with CaptureQueriesContext(connection) as queries:
+        timeline_page(RequestFactory().get("/"), user.pk, False, 4)
+    assert len(queries) == 1 and "ORDER BY" not in queries[0]["sql"], (
+        "Убедитесь, что страница профиля с готовой лентой загружает "
+        "только свои публикации по первичному ключу, без сортировки."
+    )
+
+
+def test_timeline_follows_post_changes(
+    client, user, post_with_published_location
+):
+    post = post_with_published_location
+    assert author_timeline(user.pk) == [(post.pub_date, post.pk)]
+    post.is_published = False
+    post.save()
+    assert author_timeline(user.pk) == [], (
+        "Убедитесь, что лента автора пересобирается после изменения поста."
+    )
+    assert author_timeline(user.pk, owner=True) == [(post.pub_date, post.pk)]
+
+
+def test_pages_skip_missing_entries(
+    user, many_posts_with_published_locations
+):
+    entries = author_timeline(user.pk, owner=True)
+    # The timeline still lists posts its queryset no longer returns,
+    # among them the last and the first entry of the second page.
+    hidden = {entries[index][-1] for index in (3, 4, 7, 8, 9)}
+    paginator = TimelinePaginator(
+        entries, author_posts(user.pk, True).exclude(pk__in=hidden), 4
+    )
+    pages, cursor = [], None
+    while True:
+        page = paginator.page(after=cursor)
+        pages.append([post.pk for post in page])
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+    expected = [entry[-1] for entry in entries if entry[-1] not in hidden]
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что страницы ленты не повторяют и не пропускают "
+        "публикации, если часть записей ленты отфильтрована."
+    )
+    assert all(len(ids) == 4 for ids in pages[:-1]), (
+        "Убедитесь, что страница ленты дополняется следующими записями "
+        "вместо отфильтрованных."
+    )
+    second = paginator.page(after=paginator.page().next_cursor)
+    back = paginator.page(before=second.previous_cursor)
+    assert [post.pk for post in back] == pages[0], (
+        "Убедитесь, что ссылка на предыдущую страницу ленты возвращает "
+        "к первой странице, если часть записей отфильтрована."
+    )
@@ -0,0 +1,116 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+
+from blog.models import Category, Comment, Location, Post, User
+from blog.transfer import (
+    EXPORT_CHECKPOINT,
+    data_path,
+    export_data,
+    import_data,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blog_data(settings, tmp_path, mixer):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    image = default_storage.save("img/photo.jpg", ContentFile(b"jpeg"))
+    post = mixer.blend(
+        "blog.Post", text="Первая строка\nвторая, \"в кавычках\"",
+        image=image, location=None,
+    )
+    mixer.cycle(5).blend("blog.Post", author=post.author)
+    mixer.cycle(3).blend("blog.Comment", post=post, author=post.author)
+    return post
+
+
+def snapshot():
+    return {
+        model: list(model.objects.order_by("pk").values())
+        for model in (User, Category, Location, Post, Comment)
+    }
+
+
+@pytest.mark.parametrize("data_format", ["ndjson", "csv"])
+def test_export_import_round_trip(blog_data, tmp_path, data_format):
+    before = snapshot()
+    target = tmp_path / "export"
+    export_data(target, data_format=data_format, batch_size=2)
+    assert (target / "media" / "img" / "photo.jpg").read_bytes() == b"jpeg"
+
+    for model in (Comment, Post, Location, Category, User):
+        model.objects.all().delete()
+    default_storage.delete("img/photo.jpg")
+
+    totals = import_data(target, data_format=data_format, batch_size=2)
+    assert totals[Post] == 6
+    assert snapshot() == before, (
+        "Убедитесь, что после выгрузки и загрузки данные не меняются, "
+        "включая даты создания."
+    )
+    assert default_storage.exists("img/photo.jpg")
+
+
+def test_import_updates_existing_rows(blog_data, tmp_path):
+    export_data(tmp_path / "export")
+    Post.objects.filter(pk=blog_data.pk).update(title="Изменено")
+    import_data(tmp_path / "export")
+    assert Post.objects.get(pk=blog_data.pk).title == blog_data.title
+    assert Post.objects.count() == 6
+
+
+def test_export_resumes_from_checkpoint(blog_data, tmp_path):
+    target = tmp_path / "export"
+
+    def interrupt(model, rows):
+        if model is Post:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        export_data(target, batch_size=2, progress=interrupt)
+    assert (target / EXPORT_CHECKPOINT).exists()
+
+    export_data(target, batch_size=2)
+    lines = data_path(target, Post, "ndjson").read_text().splitlines()
+    assert len(lines) == 6, (
+        "Убедитесь, что продолжение выгрузки не дублирует строки."
+    )
+    assert not (target / EXPORT_CHECKPOINT).exists()
+
+
+def test_export_reads_one_transaction(blog_data, tmp_path):
+    # The test runs in a transaction of its own, so the export's atomic
+    # block shows up as a savepoint.
+    outer = list(connection.savepoint_ids)
+    savepoints = []
+    export_data(
+        tmp_path / "export",
+        batch_size=2,
+        progress=lambda model, rows: savepoints.append(
+            tuple(connection.savepoint_ids)
+        ),
+    )
+    assert savepoints and len(set(savepoints)) == 1 and (
+        len(savepoints[0]) == len(outer) + 1
+    ), (
+        "Убедитесь, что все модели выгружаются в одной транзакции, "
+        "чтобы выгрузка была согласованным снимком данных."
+    )
+
+
+@pytest.mark.parametrize("data_format", ["ndjson", "csv"])
+def test_export_twice_to_same_directory(blog_data, tmp_path, data_format):
+    target = tmp_path / "export"
+    export_data(target, data_format=data_format)
+    path = data_path(target, Post, data_format)
+    first = path.read_bytes()
+    export_data(target, data_format=data_format)
+    assert path.read_bytes() == first, (
+        "Убедитесь, что повторная выгрузка в тот же каталог перезаписывает "
+        "файлы целиком, вместе с заголовком CSV."
+    )
+    Post.objects.all().delete()
+    assert import_data(target, data_format=data_format)[Post] == 6